@@ -7,6 +7,15 @@ from .extensions import db, mail, csrf, bootstrap, migrate, security
 from .models.user import User, Role
 from .models.department import Department
 from .models.project import Project
+from .models.job import Job
+from .models.subject_result import SubjectResult
+from .models.data_version import DataVersion
+from .models.import_ledger import ImportedFile, ImportedRow
+from .models.dashboard_stats import DashboardStats
+from .models.blob import Blob
+from .models.upload_session import UploadSession, UploadChunk
+from .services import cache, jobs, reference_data, search, storage
+from . import commands
 from config import Config
 
 def create_app(config_class=Config):
@@ -24,6 +33,21 @@ def create_app(config_class=Config):
     user_datastore = SQLAlchemyUserDatastore(db, User, Role)
     security.init_app(app, user_datastore)
 
+    # Background job runner for long imports
+    jobs.init_app(app)
+
+    # Cache for derived data and template fragments
+    cache.init_app(app)
+
+    # Department, role and subject choices for forms
+    reference_data.init_app(app)
+
+    # Content-addressed storage for uploaded files
+    storage.init_app(app)
+
+    # CLI commands
+    commands.init_app(app)
+
     # Register blueprints
     from .routes.main import bp as main_bp
     from .routes.auth import bp as auth_bp
@@ -0,0 +1,146 @@
+"""Flask CLI commands."""
+import os
+import time
+from datetime import datetime
+import click
+from .extensions import db
+from .models.user import User, Role
+from .models.project import Project
+from .models.result import Result
+from .models.subject_result import SubjectResult
+from .models.blob import Blob
+from .models.study_material import StudyMaterial
+from .services.storage import get_storage
+from .services.search import rebuild_index
+from .services.chunked_uploads import expire_uploads
+
+# Hot queries audited by `flask db-explain`: name -> function building the
+# statement with representative parameters. Register new access paths here.
+HOT_QUERIES = {
+    'results.by_student_exam': lambda: db.select(Result).filter_by(
+        student_id='4636_246260309015', exam_id='626'),
+    'results.by_student': lambda: db.select(Result).filter_by(
+        student_id='4636_246260309015').order_by(Result.declaration_date.desc()),
+    'results.import_lookup': lambda: db.select(Result.id).where(
+        Result.exam_id.in_(['626']), Result.student_id.in_(['4636_246260309015'])),
+    'results.view_filtered': lambda: db.select(Result).filter_by(
+        branch_code='6', exam_type='REG', semester=1).order_by(
+        Result.declaration_date.desc()).limit(50),
+    'results.recent': lambda: db.select(Result).order_by(
+        Result.declaration_date.desc(), Result.id.desc()).limit(5),
+    'results.since': lambda: db.select(Result).where(
+        Result.declaration_date >= datetime(2025, 1, 1)),
+    'results.page': lambda: db.select(Result).where(
+        db.tuple_(Result.declaration_date, Result.id) < (datetime(2025, 1, 1), 1000)).order_by(
+        Result.declaration_date.desc(), Result.id.desc()).limit(51),
+    'results.page_filtered': lambda: db.select(Result).filter_by(
+        branch_code='6', exam_type='REG', semester=1).where(
+        db.tuple_(Result.declaration_date, Result.id) < (datetime(2025, 1, 1), 1000)).order_by(
+        Result.declaration_date.desc(), Result.id.desc()).limit(51),
+    'users.pending': lambda: db.select(User).filter_by(is_approved=False),
+    'users.by_role': lambda: db.select(User).join(User.roles).where(Role.name == 'student'),
+    'users.roles': lambda: db.select(Role).join(Role.users).where(User.id == 1),
+    'users.page': lambda: db.select(User).where(
+        db.tuple_(User.created_at, User.id) < (datetime(2025, 1, 1), 1000)).order_by(
+        User.created_at.desc(), User.id.desc()).limit(51),
+    'users.page_by_department': lambda: db.select(User).filter_by(department_id=1).order_by(
+        User.created_at.desc(), User.id.desc()).limit(51),
+    'projects.page': lambda: db.select(Project).where(
+        db.tuple_(Project.created_at, Project.id) < (datetime(2025, 1, 1), 1000)).order_by(
+        Project.created_at.desc(), Project.id.desc()).limit(51),
+    'materials.page': lambda: db.select(StudyMaterial).where(
+        db.tuple_(StudyMaterial.upload_date, StudyMaterial.id) < (datetime(2025, 1, 1), 1000)).order_by(
+        StudyMaterial.upload_date.desc(), StudyMaterial.id.desc()).limit(25),
+    'materials.page_by_subject': lambda: db.select(StudyMaterial).filter_by(subject_id=1).order_by(
+        StudyMaterial.upload_date.desc(), StudyMaterial.id.desc()).limit(25),
+    'blobs.unreferenced': lambda: db.select(Blob.sha256).where(
+        Blob.ref_count <= 0, Blob.updated_at < datetime(2025, 1, 1)),
+    'subject_results.by_code': lambda: db.select(
+        SubjectResult.grade, db.func.count(SubjectResult.id)).filter_by(
+        subject_code='DI01000021').group_by(SubjectResult.grade),
+}
+
+
+def _explain(conn, stmt):
+    """Return (plan lines, full scan lines) for a statement on the current dialect."""
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if conn.dialect.name == 'sqlite':
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+        plan = [row[-1] for row in rows]
+        # "SCAN t" is a full table scan; "SCAN t USING [COVERING] INDEX ix" walks an index
+        scans = [line for line in plan if line.startswith('SCAN ') and ' INDEX ' not in line]
+    elif conn.dialect.name == 'postgresql':
+        # Small tables are seq scanned regardless; this reports whether an index is usable at all
+        conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = [row[0] for row in conn.exec_driver_sql(f'EXPLAIN {compiled}', params)]
+        scans = [line.strip() for line in plan if 'Seq Scan' in line]
+    else:
+        raise click.ClickException(f'db-explain does not support {conn.dialect.name}')
+    return plan, scans
+
+
+@click.command('db-explain')
+@click.option('--verbose', '-v', is_flag=True, help='Print the full plan for every query.')
+def db_explain(verbose):
+    """Check that every registered hot query is served by an index."""
+    failed = []
+    with db.engine.connect() as conn:
+        for name, build in HOT_QUERIES.items():
+            with conn.begin() as trans:
+                plan, scans = _explain(conn, build())
+                trans.rollback()
+            click.echo(f"{'FAIL' if scans else 'ok  '} {name}")
+            for line in plan if verbose else scans:
+                click.echo(f'       {line}')
+            if scans:
+                failed.append(name)
+
+    if failed:
+        raise click.ClickException(f"Full table scan in: {', '.join(failed)}")
+
+
+@click.command('blobs-gc')
+@click.option('--grace', default=3600, show_default=True,
+              help='Seconds a blob must have been unused before its file is removed.')
+def blobs_gc(grace):
+    """Remove stored files that no row references any more, and expired chunked uploads."""
+    storage = get_storage()
+    cutoff = time.time() - grace
+    removed = 0
+    for sha256 in Blob.unreferenced(grace):
+        deleted = db.session.execute(db.delete(Blob).where(
+            Blob.sha256 == sha256, Blob.ref_count <= 0))
+        db.session.commit()
+        # An upload of the same content rewrites the file before referencing it, so a
+        # fresh file means it is being reused
+        modified = storage.modified_at(sha256)
+        if deleted.rowcount and (modified is None or modified < cutoff):
+            storage.delete(sha256)
+            removed += 1
+    
+    # Temporary files left behind by interrupted uploads
+    tmp_dir = os.path.join(storage.root, 'tmp')
+    if os.path.isdir(tmp_dir):
+        for entry in os.scandir(tmp_dir):
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+    click.echo(f'Removed {removed} unreferenced blob(s)')
+    click.echo(f'Removed {expire_uploads()} expired chunked upload(s)')
+
+
+@click.command('search-reindex')
+def search_reindex():
+    """Rebuild the study material search index."""
+    count = rebuild_index()
+    db.session.commit()
+    click.echo(f'Indexed {count} study material(s)')
+
+
+def init_app(app):
+    app.cli.add_command(db_explain)
+    app.cli.add_command(blobs_gc)
+    app.cli.add_command(search_reindex)
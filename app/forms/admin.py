@@ -1,61 +1,70 @@
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed, FileRequired
-from wtforms import StringField, SelectField, SubmitField, SelectMultipleField
+from wtforms import StringField, SelectField, SubmitField, SelectMultipleField, BooleanField
 from wtforms.validators import DataRequired, Email, ValidationError, Length
-from ..models.department import Department
+from ..services.reference_data import reference_data
+
+ROLE_CHOICES = [
+    ('admin', 'Admin'),
+    ('student', 'Student'),
+    ('faculty', 'Faculty'),
+    ('hod', 'HOD')
+]
+
+def role_choices():
+    """The standard roles, then any other role that exists, e.g. created by registration"""
+    standard = {name for name, _ in ROLE_CHOICES}
+    return ROLE_CHOICES + [
+        (name, description or name.replace('_', ' ').title())
+        for name, description in reference_data().roles if name not in standard
+    ]
 
 class UserCreationForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
     first_name = StringField('First Name', validators=[DataRequired(), Length(min=2, max=50)])
     last_name = StringField('Last Name', validators=[DataRequired(), Length(min=2, max=50)])
     phone = StringField('Phone Number', validators=[DataRequired(), Length(min=10, max=15)])
-    roles = SelectMultipleField('Roles', choices=[
-        ('admin', 'Admin'),
-        ('student', 'Student'),
-        ('faculty', 'Faculty'),
-        ('hod', 'HOD')
-    ], validators=[DataRequired()])
+    roles = SelectMultipleField('Roles', validators=[DataRequired()])
     department = SelectField('Department', validators=[DataRequired()])
     submit = SubmitField('Create User')
 
     def __init__(self, *args, **kwargs):
         super(UserCreationForm, self).__init__(*args, **kwargs)
-        self.department.choices = [(str(d.id), d.name) for d in Department.query.all()]
+        self.department.choices = [(str(dept_id), name) for dept_id, name in reference_data().departments]
+        self.roles.choices = role_choices()
 
 class UserEditForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
     first_name = StringField('First Name', validators=[DataRequired(), Length(min=2, max=50)])
     last_name = StringField('Last Name', validators=[DataRequired(), Length(min=2, max=50)])
     phone = StringField('Phone Number', validators=[DataRequired(), Length(min=10, max=15)])
-    roles = SelectMultipleField('Roles', choices=[
-        ('admin', 'Admin'),
-        ('student', 'Student'),
-        ('faculty', 'Faculty'),
-        ('hod', 'HOD')
-    ], validators=[DataRequired()])
+    roles = SelectMultipleField('Roles', validators=[DataRequired()])
     department = SelectField('Department', validators=[DataRequired()])
     submit = SubmitField('Update User')
 
     def __init__(self, *args, **kwargs):
         super(UserEditForm, self).__init__(*args, **kwargs)
-        self.department.choices = [(str(d.id), d.name) for d in Department.query.all()]
+        self.department.choices = [(str(dept_id), name) for dept_id, name in reference_data().departments]
+        self.roles.choices = role_choices()
 
 class BulkUserUploadForm(FlaskForm):
     csv_file = FileField('CSV File', validators=[
         FileRequired(),
         FileAllowed(['csv'], 'CSV files only!')
     ])
-    default_roles = SelectMultipleField('Default Roles', choices=[
-        ('admin', 'Admin'),
-        ('student', 'Student'),
-        ('faculty', 'Faculty'),
-        ('hod', 'HOD')
-    ])
+    default_roles = SelectMultipleField('Default Roles')
+    dry_run = BooleanField('Only validate the file (dry run)')
     submit = SubmitField('Upload Users')
 
+    def __init__(self, *args, **kwargs):
+        super(BulkUserUploadForm, self).__init__(*args, **kwargs)
+        self.default_roles.choices = role_choices()
+
 class ResultUploadForm(FlaskForm):
     result_file = FileField('Result File (CSV)', validators=[
         FileRequired(),
         FileAllowed(['csv'], 'CSV files only!')
     ])
+    dry_run = BooleanField('Only validate the file (dry run)')
+    force = BooleanField('Re-import every row, even if this file was imported before')
     submit = SubmitField('Upload Results')
@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SelectField, SubmitField, BooleanField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
-from ..models.department import Department
+from ..services.reference_data import reference_data
 
 class ExtendedRegisterForm(FlaskForm):
     email = StringField('Email', validators=[
@@ -33,9 +33,7 @@ class ExtendedRegisterForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super(ExtendedRegisterForm, self).__init__(*args, **kwargs)
-        self.department.choices = [(0, 'Select Department')] + [
-            (dept.id, dept.name) for dept in Department.query.order_by('name')
-        ]
+        self.department.choices = [(0, 'Select Department')] + list(reference_data().departments)
 
 class LoginForm(FlaskForm):
     email = StringField('Email', validators=[
@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, SelectField, SubmitField
 from wtforms.validators import DataRequired
-from ..models.department import Department
+from ..services.reference_data import reference_data
 
 class EditProfileForm(FlaskForm):
     first_name = StringField('First Name', validators=[DataRequired()])
@@ -12,6 +12,4 @@ class EditProfileForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super(EditProfileForm, self).__init__(*args, **kwargs)
-        self.department.choices = [(0, 'Select Department')] + [
-            (dept.id, dept.name) for dept in Department.query.order_by('name')
-        ]
+        self.department.choices = [(0, 'Select Department')] + list(reference_data().departments)
@@ -21,3 +21,7 @@ class StudyMaterialForm(FlaskForm):
         FileAllowed(['pdf', 'doc', 'docx', 'ppt', 'pptx'], 'Only PDF and Office documents are allowed!')
     ])
     submit = SubmitField('Upload Material')
+
+class MaterialDetailsForm(StudyMaterialForm):
+    """The material fields sent when finishing a chunked upload; the file arrived in chunks"""
+    file = None
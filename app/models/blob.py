@@ -0,0 +1,47 @@
+from ..extensions import db
+from datetime import datetime, timedelta
+
+class Blob(db.Model):
+    """A stored file, addressed by the SHA-256 of its content.
+
+    Rows that use a file hold one reference each, so identical uploads share
+    one copy. A blob whose count dropped to zero is removed by
+    ``flask blobs-gc`` once it has been unreferenced for a grace period.
+    """
+    __tablename__ = 'blobs'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Blob {self.sha256[:12]} x{self.ref_count}>'
+    
+    @staticmethod
+    def acquire(sha256, size):
+        """Add a reference to a blob, creating its row on first use"""
+        table = Blob.__table__
+        now = datetime.utcnow()
+        updated = db.session.execute(
+            table.update().where(table.c.sha256 == sha256)
+            .values(ref_count=table.c.ref_count + 1, updated_at=now))
+        if not updated.rowcount:
+            db.session.execute(table.insert().values(
+                sha256=sha256, size=size, ref_count=1, created_at=now, updated_at=now))
+    
+    @staticmethod
+    def release(sha256):
+        """Drop a reference to a blob; the file stays until garbage collection"""
+        table = Blob.__table__
+        db.session.execute(
+            table.update().where(table.c.sha256 == sha256)
+            .values(ref_count=table.c.ref_count - 1, updated_at=datetime.utcnow()))
+    
+    @staticmethod
+    def unreferenced(grace):
+        """Hashes of blobs without references for longer than ``grace`` seconds"""
+        cutoff = datetime.utcnow() - timedelta(seconds=grace)
+        return db.session.scalars(
+            db.select(Blob.sha256).where(Blob.ref_count <= 0, Blob.updated_at < cutoff)).all()
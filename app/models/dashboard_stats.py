@@ -0,0 +1,76 @@
+from ..extensions import db
+from datetime import datetime, timedelta
+from flask import current_app
+from .user import User, Role, roles_users
+from .department import Department
+from .result import Result
+
+RECENT_RESULTS = 5
+
+class DashboardStats(db.Model):
+    """The admin dashboard figures, kept in a single precomputed row.
+
+    Code that changes users, departments or results calls ``refresh`` with
+    the affected group in the same transaction, so the dashboard is one
+    primary key read. Writes made elsewhere (shell scripts, concurrent
+    transactions) are picked up once the row is DASHBOARD_STATS_MAX_AGE
+    seconds old.
+    """
+    __tablename__ = 'dashboard_stats'
+
+    id = db.Column(db.Integer, primary_key=True)  # Always 1
+    students = db.Column(db.Integer, nullable=False, default=0)
+    lecturers = db.Column(db.Integer, nullable=False, default=0)
+    departments = db.Column(db.Integer, nullable=False, default=0)
+    pending_approvals = db.Column(db.Integer, nullable=False, default=0)
+    total_results = db.Column(db.Integer, nullable=False, default=0)
+    recent_results = db.Column(db.JSON)  # Summaries of the latest declared results
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DashboardStats {self.updated_at}>'
+
+    @staticmethod
+    def current():
+        """The stats row, recomputed first if it is missing or past its maximum age"""
+        stats = db.session.get(DashboardStats, 1)
+        max_age = timedelta(seconds=current_app.config['DASHBOARD_STATS_MAX_AGE'])
+        if stats is None or stats.updated_at < datetime.utcnow() - max_age:
+            stats = DashboardStats.refresh('users', 'results')
+            db.session.commit()
+        return stats
+
+    @staticmethod
+    def refresh(*groups):
+        """Recompute the 'users' (users, roles and departments) and/or 'results' figures"""
+        stats = db.session.get(DashboardStats, 1)
+        if stats is None:
+            stats = DashboardStats(id=1)
+            db.session.add(stats)
+            groups = ('users', 'results')
+        if 'users' in groups:
+            stats.students = _count_role('student')
+            stats.lecturers = _count_role('lecturer')
+            stats.departments = db.session.scalar(db.select(db.func.count()).select_from(Department))
+            stats.pending_approvals = db.session.scalar(
+                db.select(db.func.count()).select_from(User).where(User.is_approved == False))
+        if 'results' in groups:
+            stats.total_results = db.session.scalar(db.select(db.func.count()).select_from(Result))
+            recent = db.session.execute(
+                db.select(Result.student_id, Result.exam_id, Result.exam_name,
+                          Result.declaration_date, Result.result_status)
+                .order_by(Result.declaration_date.desc(), Result.id.desc())
+                .limit(RECENT_RESULTS)).mappings()
+            stats.recent_results = [
+                dict(row, student_id=str(row['student_id']),
+                     declaration_date=row['declaration_date'] and row['declaration_date'].strftime('%Y-%m-%d'))
+                for row in recent
+            ]
+        stats.updated_at = datetime.utcnow()
+        return stats
+
+
+def _count_role(name):
+    return db.session.scalar(
+        db.select(db.func.count()).select_from(roles_users)
+        .join(Role, Role.id == roles_users.c.role_id).where(Role.name == name))
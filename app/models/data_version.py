@@ -0,0 +1,56 @@
+from ..extensions import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    """A counter per data set, bumped in the transaction that changes the data.
+    
+    Caches of derived data remember the version they were built from and
+    rebuild once it moves, which works across processes and workers.
+    """
+    __tablename__ = 'data_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)  # e.g. 'results'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.name} {self.version}>'
+    
+    @staticmethod
+    def get(name):
+        """Current version of a data set, 0 if it was never bumped"""
+        version = db.session.execute(
+            db.select(DataVersion.version).where(DataVersion.name == name)).scalar()
+        return version or 0
+    
+    @staticmethod
+    def get_many(names):
+        """Current versions of several data sets in one query, as a dict"""
+        names = set(names)
+        if not names:
+            return {}
+        rows = db.session.execute(
+            db.select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names)))
+        return dict.fromkeys(names, 0) | dict(rows.all())
+    
+    @staticmethod
+    def bump(*names, connection=None):
+        """Invalidate caches of the named data sets once the current transaction commits.
+        
+        Pass the flush ``connection`` when calling from a mapper event.
+        """
+        names = sorted(set(names))
+        if not names:
+            return
+        execute = (connection or db.session).execute
+        table = DataVersion.__table__
+        now = datetime.utcnow()
+        execute(
+            table.update().where(table.c.name.in_(names))
+            .values(version=table.c.version + 1, updated_at=now))
+        existing = set(execute(db.select(table.c.name).where(table.c.name.in_(names))).scalars())
+        missing = [name for name in names if name not in existing]
+        if missing:
+            execute(table.insert(), [
+                {'name': name, 'version': 1, 'updated_at': now} for name in missing
+            ])
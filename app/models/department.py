@@ -1,4 +1,5 @@
 from ..extensions import db
+from .data_version import DataVersion
 
 class Department(db.Model):
     __tablename__ = 'department'
@@ -13,3 +14,18 @@ class Department(db.Model):
     
     def __repr__(self):
         return f'<Department {self.name}>'
+    
+    @staticmethod
+    def resolve_ids(names):
+        """Map department names to ids, creating the missing departments with one INSERT"""
+        names = set(names)
+        if not names:
+            return {}
+        query = db.select(Department.name, Department.id)
+        ids = dict(db.session.execute(query.where(Department.name.in_(names))).all())
+        missing = sorted(names - ids.keys())
+        if missing:
+            db.session.execute(Department.__table__.insert(), [{'name': name} for name in missing])
+            DataVersion.bump('subjects')  # Core inserts fire no mapper events; refreshes cached choice lists
+            ids.update(db.session.execute(query.where(Department.name.in_(missing))).all())
+        return ids
@@ -0,0 +1,98 @@
+from ..extensions import db
+from datetime import datetime
+
+class ImportedFile(db.Model):
+    """A file that was fully imported, identified by the SHA-256 of its content"""
+    __tablename__ = 'imported_files'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'sha256', name='uq_imported_files_kind_sha256'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # results, projects
+    sha256 = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255))
+    row_count = db.Column(db.Integer)
+    imported_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImportedFile {self.kind} {self.sha256[:12]}>'
+
+    @staticmethod
+    def find(kind, sha256):
+        return db.session.execute(
+            db.select(ImportedFile).filter_by(kind=kind, sha256=sha256)).scalar()
+
+    @staticmethod
+    def is_current(kind, sha256):
+        """Whether ``sha256`` is the file of ``kind`` imported last, so importing it again changes nothing.
+
+        An older file is imported again: later files may have changed its
+        rows, and the row ledger decides which ones to rewrite.
+        """
+        latest = db.session.execute(
+            db.select(ImportedFile.sha256).filter_by(kind=kind)
+            .order_by(ImportedFile.imported_at.desc(), ImportedFile.id.desc()).limit(1)).scalar()
+        return latest == sha256
+
+    @staticmethod
+    def record(kind, sha256, filename=None, row_count=None):
+        imported = ImportedFile.find(kind, sha256)
+        if imported:
+            imported.imported_at = datetime.utcnow()
+        else:
+            db.session.add(ImportedFile(kind=kind, sha256=sha256, filename=filename, row_count=row_count,
+                                        imported_at=datetime.utcnow()))
+
+    @staticmethod
+    def forget(kind):
+        """Stop treating any file of ``kind`` as imported, once its records changed outside imports"""
+        db.session.execute(db.delete(ImportedFile).where(ImportedFile.kind == kind))
+
+
+class ImportedRow(db.Model):
+    """The content hash of the last imported version of each source row.
+
+    Rows are keyed by the natural key of the source file, so re-imports can
+    skip unchanged rows before building any records. ``record_id`` points at
+    the row created from it where the target table has no natural key.
+    """
+    __tablename__ = 'imported_rows'
+
+    kind = db.Column(db.String(50), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    row_hash = db.Column(db.BigInteger)  # NULL forces the next import to rewrite the row
+    record_id = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImportedRow {self.kind} {self.key}>'
+
+    @staticmethod
+    def lookup(kind, keys):
+        """Map each of ``keys`` already in the ledger to its (row_hash, record_id)"""
+        table = ImportedRow.__table__
+        rows = db.session.execute(
+            db.select(table.c.key, table.c.row_hash, table.c.record_id)
+            .where(table.c.kind == kind, table.c.key.in_(list(keys))))
+        return {key: (row_hash, record_id) for key, row_hash, record_id in rows}
+
+    @staticmethod
+    def forget(kind, record_id):
+        """Drop the ledger rows of a record that was deleted, so its source row is imported afresh"""
+        table = ImportedRow.__table__
+        db.session.execute(table.delete().where(table.c.kind == kind, table.c.record_id == record_id))
+        ImportedFile.forget(kind)  # A file holding the row is no longer fully imported
+    
+    @staticmethod
+    def store(kind, entries):
+        """Replace the ledger rows for ``entries``, dicts with key, row_hash and record_id"""
+        if not entries:
+            return
+        table = ImportedRow.__table__
+        now = datetime.utcnow()
+        db.session.execute(table.delete().where(
+            table.c.kind == kind, table.c.key.in_([entry['key'] for entry in entries])))
+        db.session.execute(table.insert(), [
+            {'record_id': None, **entry, 'kind': kind, 'updated_at': now} for entry in entries
+        ])
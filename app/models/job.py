@@ -0,0 +1,73 @@
+from ..extensions import db
+from datetime import datetime
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # result_upload, user_upload, project_import
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, succeeded, failed
+    
+    # Progress
+    total_rows = db.Column(db.Integer)
+    processed_rows = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    errors = db.Column(db.JSON)
+    message = db.Column(db.String(255))
+    result = db.Column(db.JSON)  # Summary counts returned by the task
+    artifact = db.Column(db.String(255))  # Download name of a file produced by the task
+    
+    created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    
+    # Timing
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    created_by = db.relationship('User')
+    
+    MAX_ERRORS = 50  # Only the first errors are kept, error_count has the total
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+    
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+    
+    @property
+    def duration(self):
+        """Seconds spent running, up to now if the job is still running"""
+        if not self.started_at:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        return (end - self.started_at).total_seconds()
+    
+    def update_progress(self, processed_rows=None, total_rows=None, errors=None):
+        """Record progress; it is persisted with the task's next commit"""
+        if processed_rows is not None:
+            self.processed_rows = processed_rows
+        if total_rows is not None:
+            self.total_rows = total_rows
+        if errors:
+            self.error_count = (self.error_count or 0) + len(errors)
+            self.errors = ((self.errors or []) + list(errors))[:self.MAX_ERRORS]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'processed_rows': self.processed_rows,
+            'error_count': self.error_count,
+            'errors': self.errors or [],
+            'message': self.message,
+            'result': self.result,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration': self.duration,
+            'finished': self.is_finished,
+            'artifact': self.artifact,
+        }
@@ -3,9 +3,17 @@ from datetime import datetime
 
 class Result(db.Model):
     __tablename__ = 'results'
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'exam_id', name='uq_results_student_exam'),
+        # A student's results, newest first
+        db.Index('ix_results_student_date', 'student_id', 'declaration_date'),
+        # view_results filters, ordered by declaration date
+        db.Index('ix_results_filters', 'branch_code', 'exam_type', 'semester', 'declaration_date'),
+        db.Index('ix_results_declaration_date', 'declaration_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     exam_id = db.Column(db.String(20))
     exam_type = db.Column(db.String(20))
     exam_name = db.Column(db.String(100))
@@ -24,13 +32,14 @@ class Result(db.Model):
     sgpa = db.Column(db.Float)
     result_status = db.Column(db.String(20))  # PASS/FAIL
     
-    # Subject results (store as JSON)
-    subject_results = db.Column(db.JSON)
-    
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Subject results, one row per subject
+    subjects = db.relationship('SubjectResult', backref='result', order_by='SubjectResult.slot',
+                               cascade='all, delete-orphan', passive_deletes=True)
+    
     def __repr__(self):
         return f'<Result {self.student_id} {self.exam_name}>'
     
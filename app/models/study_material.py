@@ -3,12 +3,19 @@ from app.extensions import db
 
 class StudyMaterial(db.Model):
     __tablename__ = 'study_materials'
+    __table_args__ = (
+        # Keyset pagination of the materials list, optionally by subject
+        db.Index('ix_study_materials_upload_date_id', 'upload_date', 'id'),
+        db.Index('ix_study_materials_subject_upload_date_id', 'subject_id', 'upload_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     material_type = db.Column(db.String(50), nullable=False)  # Lab Manual, Lecture Notes, etc.
-    file_path = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(255), nullable=False)  # Relative to UPLOAD_FOLDER
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blobs.sha256', name='fk_study_materials_blob_sha256'), index=True)  # NULL for older uploads
+    original_filename = db.Column(db.String(255))
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
     faculty_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
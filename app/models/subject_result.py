@@ -0,0 +1,56 @@
+from ..extensions import db
+from .result import Result
+
+class SubjectResult(db.Model):
+    __tablename__ = 'subject_results'
+    __table_args__ = (
+        db.Index('ix_subject_results_code_grade', 'subject_code', 'grade'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.Integer, db.ForeignKey('results.id', ondelete='CASCADE'),
+                          nullable=False, index=True)
+    slot = db.Column(db.Integer)  # n of the SUBn column group, keeps marksheet order
+    subject_code = db.Column(db.String(20), nullable=False)
+    subject_name = db.Column(db.String(200))
+    credits = db.Column(db.Float)
+    grade = db.Column(db.String(5), index=True)
+    grade_points = db.Column(db.Float)
+    
+    # Component grades from the GTU export
+    theory_grade = db.Column(db.String(5))         # SUBnGRTH
+    theory_ese_grade = db.Column(db.String(5))     # SUBnGRE
+    theory_pa_grade = db.Column(db.String(5))      # SUBnGRM
+    practical_grade = db.Column(db.String(5))      # SUBnGRPR
+    practical_ese_grade = db.Column(db.String(5))  # SUBnGRV
+    practical_pa_grade = db.Column(db.String(5))   # SUBnGRI
+    
+    def __repr__(self):
+        return f'<SubjectResult {self.result_id} {self.subject_code} {self.grade}>'
+    
+    @staticmethod
+    def grade_distribution(subject_code, exam_id=None):
+        """Number of students per grade for a subject, e.g. {'AA': 12, 'FF': 3}"""
+        query = db.session.query(SubjectResult.grade, db.func.count(SubjectResult.id)) \
+            .filter(SubjectResult.subject_code == subject_code)
+        if exam_id:
+            query = query.join(Result).filter(Result.exam_id == exam_id)
+        return dict(query.group_by(SubjectResult.grade).all())
+    
+    @staticmethod
+    def failure_counts(exam_id=None):
+        """Number of FF grades per subject code, highest first"""
+        count = db.func.count(SubjectResult.id)
+        query = db.session.query(SubjectResult.subject_code, SubjectResult.subject_name, count) \
+            .filter(SubjectResult.grade == 'FF')
+        if exam_id:
+            query = query.join(Result).filter(Result.exam_id == exam_id)
+        return query.group_by(SubjectResult.subject_code, SubjectResult.subject_name) \
+            .order_by(count.desc()).all()
+    
+    @staticmethod
+    def students_with_grade(subject_code, grade):
+        """Results of the students who got ``grade`` in a subject"""
+        return Result.query.join(SubjectResult) \
+            .filter(SubjectResult.subject_code == subject_code, SubjectResult.grade == grade) \
+            .order_by(Result.student_id).all()
@@ -0,0 +1,45 @@
+from ..extensions import db
+from datetime import datetime
+
+class UploadSession(db.Model):
+    """A chunked upload in progress, staged on disk until it is finalized"""
+    __tablename__ = 'upload_sessions'
+    
+    id = db.Column(db.String(32), primary_key=True)  # Random hex token, used in URLs
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Last chunk
+    
+    chunks = db.relationship('UploadChunk', cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<UploadSession {self.id} {self.filename}>'
+    
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.size // self.chunk_size))
+    
+    def chunk_length(self, index):
+        """Expected size in bytes of chunk ``index``"""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+    
+    def received(self):
+        """Indexes of the chunks stored so far, in order"""
+        return db.session.scalars(
+            db.select(UploadChunk.index).filter_by(session_id=self.id).order_by(UploadChunk.index)).all()
+
+
+class UploadChunk(db.Model):
+    """A chunk of an upload session that was written and verified"""
+    __tablename__ = 'upload_chunks'
+    
+    session_id = db.Column(db.String(32), db.ForeignKey('upload_sessions.id', ondelete='CASCADE'), primary_key=True)
+    index = db.Column(db.Integer, primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    
+    def __repr__(self):
+        return f'<UploadChunk {self.session_id} #{self.index}>'
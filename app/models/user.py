@@ -1,12 +1,15 @@
 from ..extensions import db
 from flask_security import UserMixin, RoleMixin
+from sqlalchemy import event
 import uuid
 from datetime import datetime
 
 # Association table for user roles
 roles_users = db.Table('roles_users',
     db.Column('user_id', db.Integer(), db.ForeignKey('user.id', name='fk_roles_users_user')),
-    db.Column('role_id', db.Integer(), db.ForeignKey('role.id', name='fk_roles_users_role'))
+    db.Column('role_id', db.Integer(), db.ForeignKey('role.id', name='fk_roles_users_role')),
+    db.Index('ix_roles_users_user_role', 'user_id', 'role_id'),
+    db.Index('ix_roles_users_role_user', 'role_id', 'user_id')
 )
 
 class Role(db.Model, RoleMixin):
@@ -18,6 +21,12 @@ class Role(db.Model, RoleMixin):
         return self.name
 
 class User(db.Model, UserMixin):
+    __table_args__ = (
+        # Keyset pagination of the admin user lists, optionally by department
+        db.Index('ix_user_created_at_id', 'created_at', 'id'),
+        db.Index('ix_user_department_created_at_id', 'department_id', 'created_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True)
     password = db.Column(db.String(255))
@@ -37,7 +46,7 @@ class User(db.Model, UserMixin):
     department_id = db.Column(db.Integer, db.ForeignKey('department.id'))
     
     # Approval fields
-    is_approved = db.Column(db.Boolean, default=False)
+    is_approved = db.Column(db.Boolean, default=False, index=True)
     approval_date = db.Column(db.DateTime)
     approved_by_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_user_approver'))
     
@@ -54,10 +63,32 @@ class User(db.Model, UserMixin):
     def __str__(self):
         return f"{self.email} ({', '.join(role.name for role in self.roles)})"
     
+    @property
+    def role_names(self):
+        """Names of the user's roles, computed once per loaded instance.
+        
+        The user loader fetches the roles with the user and the session lasts
+        one request, so repeated role checks run no SQL. Changing the roles or
+        expiring the instance drops the set.
+        """
+        names = self.__dict__.get('_role_names')
+        if names is None:
+            names = self._role_names = frozenset(role.name for role in self.roles)
+        return names
+    
     @property
     def is_admin(self):
-        return any(role.name == 'admin' for role in self.roles)
+        return 'admin' in self.role_names
     
     def has_role(self, role):
-        """Check if user has the specified role"""
-        return any(r.name == role for r in self.roles)
+        """Check if user has the specified role, given by name or as a Role"""
+        return (role if isinstance(role, str) else role.name) in self.role_names
+
+
+def _forget_role_names(target, *args):
+    target.__dict__.pop('_role_names', None)
+
+for name in ('append', 'remove', 'set'):
+    event.listen(User.roles, name, _forget_role_names)
+for name in ('expire', 'refresh'):
+    event.listen(User, name, _forget_role_names)
@@ -1,15 +1,27 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort, send_file
 from flask_security import roles_required, current_user, login_required
 from flask_security.utils import hash_password
-from ..models.user import User, Role
+from ..models.user import User, Role, roles_users
 from ..models.department import Department
 from ..models.project import Project
 from ..models.result import Result
+from ..models.subject_result import SubjectResult
+from ..models.job import Job
+from ..models.dashboard_stats import DashboardStats
+from ..models.import_ledger import ImportedRow
 from ..forms.admin import UserCreationForm, BulkUserUploadForm, ResultUploadForm
+from ..services.jobs import submit_job, pop_artifact
+from ..services.uploads import stage_upload
+from ..services.result_import import import_result_file
+from ..services.user_import import import_users
+from ..services.project_import import import_project_file
+from ..services.pagination import keyset_page, page_size, InvalidCursor
+from ..services.result_facets import result_facets
 from ..extensions import db
+from sqlalchemy.orm import selectinload
+from collections import Counter, defaultdict
+import io
 from datetime import datetime
-import pandas as pd
-import os
 from flask import current_app
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -17,40 +29,115 @@ bp = Blueprint('admin', __name__, url_prefix='/admin')
 @bp.route('/')
 @roles_required('admin')
 def index():
-    # Get all users and pending users
-    pending_users = User.query.filter_by(is_approved=False).all()
-    
-    # Get users by role
-    hod_role = Role.query.filter_by(name='hod').first()
-    lecturer_role = Role.query.filter_by(name='lecturer').first()
-    student_role = Role.query.filter_by(name='student').first()
-    lab_assistant_role = Role.query.filter_by(name='lab_assistant').first()
-    librarian_role = Role.query.filter_by(name='librarian').first()
-    store_officer_role = Role.query.filter_by(name='store_officer').first()
-    
-    hods = User.query.filter(User.roles.contains(hod_role)).all() if hod_role else []
-    lecturers = User.query.filter(User.roles.contains(lecturer_role)).all() if lecturer_role else []
-    students = User.query.filter(User.roles.contains(student_role)).all() if student_role else []
-    lab_assistants = User.query.filter(User.roles.contains(lab_assistant_role)).all() if lab_assistant_role else []
-    librarians = User.query.filter(User.roles.contains(librarian_role)).all() if librarian_role else []
-    store_officers = User.query.filter(User.roles.contains(store_officer_role)).all() if store_officer_role else []
-    
-    # Get departments
-    departments = Department.query.all()
-    
-    # Get projects
-    projects = Project.query.all()
+    # The role and project tabs load their rows page by page from
+    # api_users / api_projects; only the pending queue is rendered here
+    pending_users = User.query.options(selectinload(User.roles), selectinload(User.department)) \
+        .filter_by(is_approved=False).order_by(User.created_at.desc()).all()
+    
+    # Get departments, with their student and lecturer counts from one grouped query
+    departments = Department.query.options(selectinload(Department.hod)).all()
+    department_counts = defaultdict(Counter)
+    counts = db.session.query(User.department_id, Role.name, db.func.count(User.id)) \
+        .join(User.roles).filter(User.department_id.isnot(None)) \
+        .group_by(User.department_id, Role.name)
+    for department_id, role_name, count in counts:
+        department_counts[department_id][role_name] = count
+    
+    # Project semesters for the projects tab filter
+    semesters = [semester for semester, in db.session.query(Project.semester).distinct()
+                 .filter(Project.semester.isnot(None)).order_by(Project.semester)]
     
     return render_template('admin/index.html', 
                          pending_users=pending_users,
-                         hods=hods,
-                         lecturers=lecturers,
-                         students=students,
-                         lab_assistants=lab_assistants,
-                         librarians=librarians,
-                         store_officers=store_officers,
                          departments=departments,
-                         projects=projects)
+                         department_counts=department_counts,
+                         semesters=semesters)
+
+def _user_json(user):
+    return {
+        'id': user.id,
+        'name': f"{user.first_name or ''} {user.last_name or ''}".strip(),
+        'email': user.email,
+        'phone': user.phone,
+        'department': user.department.name if user.department else None,
+        'roles': [role.name for role in user.roles],
+        'is_approved': bool(user.is_approved),
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'urls': {
+            'edit': url_for('admin.edit_user', user_id=user.id),
+            'delete': url_for('admin.delete_user', user_id=user.id),
+            'approve': url_for('admin.approve_user', user_id=user.id),
+            'reject': url_for('admin.reject_user', user_id=user.id),
+        },
+    }
+
+def _project_json(project):
+    return {
+        'id': project.id,
+        'name': project.name,
+        'description': project.description,
+        'department': project.department.name if project.department else None,
+        'group_leader': project.group_leader,
+        'members': project.members,
+        'marks': project.marks,
+        'semester': project.semester,
+        'presentation_type': project.presentation_type,
+        'created_at': project.created_at.isoformat() if project.created_at else None,
+        'urls': {
+            'delete': url_for('admin.delete_project', project_id=project.id),
+        },
+    }
+
+def _keyset_json(query, model, serialize):
+    try:
+        items, next_cursor, _ = keyset_page(query, model, request.args.get('cursor'), page_size())
+    except InvalidCursor as e:
+        abort(400, description=str(e))
+    return jsonify({'items': [serialize(item) for item in items], 'next_cursor': next_cursor})
+
+@bp.route('/api/users')
+@roles_required('admin')
+def api_users():
+    """Users newest first, filtered by role, department, status and a search term"""
+    query = User.query.options(selectinload(User.roles), selectinload(User.department))
+    
+    role = request.args.get('role')
+    if role:
+        query = query.filter(User.roles.any(Role.name == role))
+    department_id = request.args.get('department', type=int)
+    if department_id:
+        query = query.filter(User.department_id == department_id)
+    status = request.args.get('status')
+    if status == 'pending':
+        query = query.filter(User.is_approved == False)
+    elif status == 'approved':
+        query = query.filter(User.is_approved == True)
+    search = request.args.get('q', '').strip()
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(db.or_(User.email.ilike(pattern),
+                                    User.first_name.ilike(pattern),
+                                    User.last_name.ilike(pattern)))
+    
+    return _keyset_json(query, User, _user_json)
+
+@bp.route('/api/projects')
+@roles_required('admin')
+def api_projects():
+    """Projects newest first, filtered by department, semester and a search term"""
+    query = Project.query.options(selectinload(Project.department))
+    
+    department_id = request.args.get('department', type=int)
+    if department_id:
+        query = query.filter(Project.department_id == department_id)
+    semester = request.args.get('semester')
+    if semester:
+        query = query.filter(Project.semester == semester)
+    search = request.args.get('q', '').strip()
+    if search:
+        query = query.filter(Project.name.ilike(f'%{search}%'))
+    
+    return _keyset_json(query, Project, _project_json)
 
 @bp.route('/approve_user/<int:user_id>', methods=['POST'])
 @roles_required('admin')
@@ -59,6 +146,7 @@ def approve_user(user_id):
     user.is_approved = True
     user.approval_date = datetime.utcnow()
     user.approved_by = current_user
+    DashboardStats.refresh('users')
     db.session.commit()
     flash(f'User {user.email} has been approved.', 'success')
     return redirect(url_for('admin.index'))
@@ -68,6 +156,7 @@ def approve_user(user_id):
 def reject_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
+    DashboardStats.refresh('users')
     db.session.commit()
     flash(f'User {user.email} has been rejected and removed.', 'success')
     return redirect(url_for('admin.index'))
@@ -91,6 +180,7 @@ def create_department():
         department.hod_id = hod_id
     
     db.session.add(department)
+    DashboardStats.refresh('users')
     db.session.commit()
     
     flash(f'Department {name} has been created.', 'success')
@@ -131,6 +221,7 @@ def delete_department(dept_id):
         return redirect(url_for('admin.index', _anchor='departments'))
     
     db.session.delete(department)
+    DashboardStats.refresh('users')
     db.session.commit()
     
     flash(f'Department {name} has been deleted.', 'success')
@@ -140,12 +231,16 @@ def delete_department(dept_id):
 @roles_required('admin')
 def users():
     # Get role counts for the stats cards
-    role_counts = {}
-    for role in Role.query.all():
-        role_counts[role.name] = User.query.join(User.roles).filter(Role.name == role.name).count()
+    role_counts = dict(
+        db.session.query(Role.name, db.func.count(roles_users.c.user_id))
+        .outerjoin(roles_users, roles_users.c.role_id == Role.id)
+        .group_by(Role.id, Role.name)
+        .order_by(Role.id)
+        .all())
 
     # Get recent users for the table
-    recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
+    recent_users = User.query.options(selectinload(User.roles), selectinload(User.department)) \
+        .order_by(User.created_at.desc()).limit(10).all()
     
     # Create form instance for the modal
     form = UserCreationForm()
@@ -179,6 +274,7 @@ def create_user():
                     user.roles.append(role)
             
             db.session.add(user)
+            DashboardStats.refresh('users')
             db.session.commit()
             flash('User created successfully! Temporary password: changeme123', 'success')
         except Exception as e:
@@ -199,74 +295,12 @@ def bulk_upload():
     form = BulkUserUploadForm()
     if form.validate_on_submit():
         try:
-            df = pd.read_csv(request.files[form.file.name])
-            
-            # Get or create selected roles
-            user_roles = []
-            for role_name in form.roles.data:
-                role = Role.query.filter_by(name=role_name).first()
-                if not role:
-                    role = Role(name=role_name)
-                    db.session.add(role)
-                    db.session.flush()
-                user_roles.append(role)
-            
-            success_count = 0
-            error_count = 0
-            
-            for _, row in df.iterrows():
-                try:
-                    # Check if user already exists
-                    if User.query.filter_by(email=row['email']).first():
-                        error_count += 1
-                        continue
-                    
-                    # Get or create department
-                    department = None
-                    if 'department' in row and row['department']:
-                        department = Department.query.filter_by(name=row['department']).first()
-                        if not department:
-                            department = Department(name=row['department'])
-                            db.session.add(department)
-                            db.session.flush()  # Get the ID without committing
-                    
-                    # Handle additional roles from CSV if present
-                    roles_to_assign = user_roles.copy()  # Start with the roles selected in the form
-                    if 'roles' in row and row['roles']:
-                        additional_role_names = [r.strip() for r in str(row['roles']).split(',')]
-                        for role_name in additional_role_names:
-                            if role_name:  # Skip empty strings
-                                role = Role.query.filter_by(name=role_name).first()
-                                if not role:
-                                    role = Role(name=role_name)
-                                    db.session.add(role)
-                                    db.session.flush()
-                                if role not in roles_to_assign:
-                                    roles_to_assign.append(role)
-                    
-                    user = User(
-                        email=row['email'],
-                        password=hash_password('changeme123'),  # Temporary password
-                        first_name=row['first_name'],
-                        last_name=row['last_name'],
-                        phone=str(row['phone']),
-                        department_id=department.id if department else None,
-                        active=True,
-                        is_approved=True,
-                        approval_date=datetime.utcnow(),
-                        approved_by=current_user,
-                        roles=roles_to_assign
-                    )
-                    db.session.add(user)
-                    success_count += 1
-                except Exception as e:
-                    error_count += 1
-                    continue
-            
-            db.session.commit()
-            flash(f'Bulk upload completed. {success_count} users created, {error_count} failed. '
-                  f'Temporary password for all users: changeme123', 'success')
-            return redirect(url_for('admin.index'))
+            upload = stage_upload(form.csv_file.data)
+            job = submit_job('user_upload', import_users, upload,
+                             form.default_roles.data, current_user.id, dry_run=form.dry_run.data)
+            flash('Validating the file.' if form.dry_run.data
+                  else 'Bulk upload started. Progress is shown below.', 'info')
+            return redirect(url_for('admin.bulk_upload', job=job.id))
             
         except Exception as e:
             flash(f'Error processing file: {str(e)}', 'error')
@@ -350,6 +384,7 @@ def delete_project(project_id):
     name = project.name
     
     db.session.delete(project)
+    ImportedRow.forget('projects', project.id)
     db.session.commit()
     
     flash(f'Project {name} has been deleted.', 'success')
@@ -372,21 +407,13 @@ def import_projects():
         return redirect(url_for('admin.index', _anchor='projects'))
     
     try:
-        # Save the file temporarily
-        temp_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'temp.csv')
-        file.save(temp_path)
-        
-        # Import projects from CSV
-        projects = Project.import_from_csv(temp_path)
-        
-        # Add all projects to database
-        for project in projects:
-            db.session.add(project)
-        
-        db.session.commit()
-        os.remove(temp_path)  # Clean up temp file
-        
-        flash(f'Successfully imported {len(projects)} projects.', 'success')
+        upload = stage_upload(file, hash_content=True)
+        dry_run = bool(request.form.get('dry_run'))
+        job = submit_job('project_import', import_project_file, upload, dry_run=dry_run,
+                         force=bool(request.form.get('force')))
+        flash('Validating the file.' if dry_run
+              else 'Project import started. Progress is shown below.', 'info')
+        return redirect(url_for('admin.index', job=job.id, _anchor='projects'))
     except Exception as e:
         flash(f'Error importing projects: {str(e)}', 'error')
     
@@ -424,6 +451,7 @@ def edit_user(user_id):
         user.department_id = department.id if department else None
         user.roles = user_roles
         
+        DashboardStats.refresh('users')
         db.session.commit()
         flash(f'User {user.email} has been updated.', 'success')
         return redirect(url_for('admin.index'))
@@ -436,6 +464,7 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     email = user.email
     db.session.delete(user)
+    DashboardStats.refresh('users')
     db.session.commit()
     flash(f'User {email} has been deleted.', 'success')
     return redirect(url_for('admin.index'))
@@ -447,106 +476,44 @@ def upload_results():
     form = ResultUploadForm()
     if form.validate_on_submit():
         try:
-            csv_file = form.result_file.data
-            print(f"Reading CSV file...")
-            # Save file temporarily
-            csv_file.save('temp_results.csv')
-            # Read CSV file into pandas DataFrame
-            df = pd.read_csv('temp_results.csv')
-            print(f"Found {len(df)} rows in CSV")
-            
-            success_count = 0
-            # Process each row in the DataFrame
-            for _, row in df.iterrows():
-                try:
-                    # Create or update result record
-                    result = Result.query.filter_by(
-                        student_id=row['St_Id'],
-                        exam_id=row['examid']
-                    ).first()
-                    
-                    if not result:
-                        result = Result()
-                        print(f"Creating new result for student {row['St_Id']}")
-                    else:
-                        print(f"Updating existing result for student {row['St_Id']}")
-                    
-                    # Map CSV data to Result model fields
-                    result.student_id = row['St_Id']
-                    result.exam_id = row['examid']
-                    result.exam_type = row['extype']
-                    result.exam_name = row['exam']
-                    result.declaration_date = pd.to_datetime(row['DECLARATIONDATE']).date()
-                    result.academic_year = row['AcademicYear']
-                    result.semester = int(row['sem'])
-                    result.student_name = row['name']
-                    result.institute_code = row['instcode']
-                    result.institute_name = row['instName']
-                    result.course_name = row['CourseName']
-                    result.branch_code = str(row['BR_CODE'])
-                    result.branch_name = row['BR_NAME']
-                    
-                    # Store subject results as JSON
-                    subjects = {}
-                    for i in range(1, 16):  # Process SUB1 to SUB15
-                        sub_code = row.get(f'SUB{i}')
-                        if pd.notna(sub_code):
-                            subjects[f'SUB{i}'] = {
-                                'code': sub_code,
-                                'name': row.get(f'SUB{i}NA', ''),
-                                'credits': float(row.get(f'SUB{i}CR', 0)),
-                                'grade': row.get(f'SUB{i}GR', ''),
-                            }
-                    result.subject_results = subjects
-                    
-                    # Calculate total credits and grade points
-                    total_credits = 0
-                    total_grade_points = 0
-                    for sub in subjects.values():
-                        total_credits += sub['credits']
-                        grade = sub['grade']
-                        # Convert grade to grade points
-                        grade_points = {
-                            'AA': 10, 'AB': 9, 'BB': 8, 'BC': 7, 'CC': 6, 'CD': 5, 'DD': 4, 'FF': 0
-                        }.get(grade, 0)
-                        total_grade_points += sub['credits'] * grade_points
-                    
-                    result.total_credits = total_credits
-                    result.total_grade_points = total_grade_points
-                    result.sgpa = total_grade_points / total_credits if total_credits > 0 else 0.0
-                    result.result_status = 'FAIL' if 'FF' in [s['grade'] for s in subjects.values()] else 'PASS'
-                    
-                    db.session.add(result)
-                    success_count += 1
-                    
-                except Exception as e:
-                    print(f"Error processing row for student {row.get('St_Id', 'unknown')}: {str(e)}")
-                    continue
-            
-            try:
-                print(f"Committing {success_count} results to database...")
-                db.session.commit()
-                flash(f'Successfully uploaded {success_count} results!', 'success')
-            except Exception as e:
-                print(f"Error during commit: {str(e)}")
-                db.session.rollback()
-                flash(f'Error saving results to database: {str(e)}', 'danger')
-            
-            return redirect(url_for('admin.upload_results'))
+            upload = stage_upload(form.result_file.data, hash_content=True)
+            job = submit_job('result_upload', import_result_file, upload, dry_run=form.dry_run.data,
+                             force=form.force.data)
+            flash('Validating the file.' if form.dry_run.data
+                  else 'Result upload started. Progress is shown below.', 'info')
+            return redirect(url_for('admin.upload_results', job=job.id))
             
         except Exception as e:
-            print(f"Error processing CSV file: {str(e)}")
-            db.session.rollback()
+            current_app.logger.exception("Error processing CSV file")
             flash(f'Error uploading results: {str(e)}', 'danger')
             return redirect(url_for('admin.upload_results'))
     
     return render_template('admin/upload_results.html', form=form)
 
+@bp.route('/jobs/<int:job_id>')
+@roles_required('admin')
+def job_status(job_id):
+    job = Job.query.get_or_404(job_id)
+    data = job.to_dict()
+    data['artifact_url'] = url_for('admin.job_artifact', job_id=job.id) if job.artifact else None
+    return jsonify(data)
+
+@bp.route('/jobs/<int:job_id>/artifact')
+@roles_required('admin')
+def job_artifact(job_id):
+    job = Job.query.get_or_404(job_id)
+    artifact = pop_artifact(job)
+    if artifact is None:
+        abort(404)
+    db.session.commit()
+    name, data = artifact
+    return send_file(io.BytesIO(data), as_attachment=True, download_name=name,
+                     mimetype='text/csv' if name.endswith('.csv') else None)
+
 @bp.route('/view-results')
 @login_required
 @roles_required('admin')
 def view_results():
-    page = request.args.get('page', 1, type=int)
     branch = request.args.get('branch', '')
     exam_type = request.args.get('exam_type', '')
     semester = request.args.get('semester', '')
@@ -562,24 +529,49 @@ def view_results():
     if semester:
         query = query.filter(Result.semester == semester)
     
-    # Get unique filter options for dropdowns
-    branches = db.session.query(Result.branch_code, Result.branch_name).distinct().all()
-    exam_types = db.session.query(Result.exam_type).distinct().all()
-    semesters = db.session.query(Result.semester).distinct().order_by(Result.semester).all()
+    # Filter options for the dropdowns, rebuilt only after a result import
+    facets = result_facets()
     
-    # Paginate results
-    results = query.order_by(Result.declaration_date.desc()).paginate(
-        page=page, per_page=50, error_out=False)
+    # Keyset pages, newest declaration first
+    try:
+        results, next_cursor, prev_cursor = keyset_page(
+            query, Result, request.args.get('cursor'), limit=50,
+            key='declaration_date', before=request.args.get('before'))
+    except InvalidCursor:
+        abort(400)
     
     return render_template('admin/view_results.html',
                          results=results,
-                         branches=branches,
-                         exam_types=exam_types,
-                         semesters=semesters,
+                         next_cursor=next_cursor,
+                         prev_cursor=prev_cursor,
+                         branches=facets['branches'],
+                         exam_types=facets['exam_types'],
+                         semesters=facets['semesters'],
                          current_branch=branch,
                          current_exam_type=exam_type,
                          current_semester=semester)
 
+@bp.route('/api/subjects/<string:subject_code>/grades')
+@login_required
+@roles_required('admin')
+def subject_grades(subject_code):
+    exam_id = request.args.get('exam_id') or None
+    return jsonify({
+        'subject_code': subject_code,
+        'exam_id': exam_id,
+        'grades': SubjectResult.grade_distribution(subject_code, exam_id),
+    })
+
+@bp.route('/api/subjects/failures')
+@login_required
+@roles_required('admin')
+def subject_failures():
+    exam_id = request.args.get('exam_id') or None
+    return jsonify([
+        {'subject_code': code, 'subject_name': name, 'failures': count}
+        for code, name, count in SubjectResult.failure_counts(exam_id)
+    ])
+
 @bp.route('/result/<string:student_id>/<string:exam_id>')
 @login_required
 def view_result_details(student_id, exam_id):
@@ -6,7 +6,7 @@ from ..extensions import db, security
 from ..forms.auth import ExtendedRegisterForm, LoginForm
 from ..forms.profile import EditProfileForm
 from ..models.user import User, Role
-from ..models.department import Department
+from ..models.dashboard_stats import DashboardStats
 
 bp = Blueprint('auth', __name__)
 
@@ -22,20 +22,18 @@ def register():
             role = Role(name=form.role.data)
             db.session.add(role)
         
-        # Get the department
-        department = Department.query.get(form.department.data) if form.department.data != 0 else None
-        
         user = User(
             email=form.email.data,
             password=hash_password(form.password.data),
             first_name=form.first_name.data,
             last_name=form.last_name.data,
             phone=form.phone.data,
-            department_id=department.id if department else None,
+            department_id=form.department.data or None,  # Validated against the department choices
             active=True,
             roles=[role]
         )
         db.session.add(user)
+        DashboardStats.refresh('users')
         db.session.commit()
         
         flash('Registration successful. Please wait for admin approval.', 'success')
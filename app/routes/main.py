@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app.models.result import Result
-from app.models.user import User
+from app.models.dashboard_stats import DashboardStats
+from app.services.conditional import render_conditional
 
 bp = Blueprint('main', __name__)
 
@@ -14,12 +15,7 @@ def index():
 @login_required
 def dashboard():
     if current_user.has_role('admin'):
-        # Get stats for admin dashboard
-        stats = {
-            'students': User.query.filter(User.roles.any(name='student')).count(),
-            'total_results': Result.query.count(),
-            'recent_results': Result.query.order_by(Result.declaration_date.desc()).limit(5).all()
-        }
+        stats = DashboardStats.current()
         return render_template('dashboard/admin.html', stats=stats)
     elif current_user.has_role('student'):
         # Get latest result for the student
@@ -46,7 +42,8 @@ def view_results():
 def view_result_details(result_id):
     if current_user.has_role('student'):
         result = Result.query.filter_by(id=result_id, student_id=current_user.id).first_or_404()
-        return render_template('student/result_details.html', result=result)
+        return render_conditional('student/result_details.html', result.updated_at,
+                                  'result', result.id, result.updated_at, result=result)
     else:
         flash('You do not have permission to view this result.', 'error')
         return redirect(url_for('main.dashboard'))
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, abort
 from flask_login import login_required, current_user
 from app.models.result import Result
+from app.services.conditional import render_conditional
 
 bp = Blueprint('student', __name__)
 
@@ -28,4 +29,5 @@ def view_result(exam_id):
         exam_id=exam_id
     ).first_or_404()
     
-    return render_template('student/result_view.html', result=result)
+    return render_conditional('student/result_view.html', result.updated_at,
+                              'result', result.id, result.updated_at, result=result)
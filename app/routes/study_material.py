@@ -1,49 +1,65 @@
 import os
-from flask import Blueprint, render_template, current_app, request, flash, redirect, url_for, send_from_directory
+from flask import Blueprint, render_template, current_app, request, flash, redirect, url_for, abort, jsonify
 from flask_security import login_required, current_user, roles_required
+from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 from app.extensions import db
 from app.models.study_material import StudyMaterial
-from app.models.subject import Subject
-from app.forms.study_material import StudyMaterialForm
+from app.models.blob import Blob
+from app.models.upload_session import UploadSession
+from app.forms.study_material import StudyMaterialForm, MaterialDetailsForm
+from app.services.cache import invalidate
+from app.services.catalog import subject_tree
+from app.services.chunked_uploads import UploadRejected, start_upload, write_chunk, finish_upload
+from app.services.conditional import render_conditional
+from app.services.file_delivery import send_upload
+from app.services.pagination import keyset_page, decode_cursor, InvalidCursor
+from app.services.reference_data import reference_data
+from app.services.storage import get_storage
+from app.services.search import index_material, remove_material, search_materials
 
 bp = Blueprint('study_material', __name__)
 
+MATERIALS_DIR = 'materials'  # Under UPLOAD_FOLDER, used by uploads stored before blobs
+BLOB_MAX_AGE = 365 * 24 * 3600
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in {'pdf', 'doc', 'docx', 'ppt', 'pptx'}
 
+def _create_material(form, sha256, size, filename):
+    """Add a material for a stored blob, described by a validated form"""
+    Blob.acquire(sha256, size)
+    material = StudyMaterial(
+        title=form.title.data,
+        description=form.description.data,
+        material_type=form.material_type.data,
+        file_path=get_storage().relative_path(sha256),
+        blob_sha256=sha256,
+        original_filename=secure_filename(filename),
+        subject_id=form.subject.data,
+        faculty_id=current_user.id
+    )
+    db.session.add(material)
+    db.session.flush()
+    index_material(material)
+    invalidate('materials')
+    return material
+
 @bp.route('/materials/upload', methods=['GET', 'POST'])
 @login_required
 @roles_required('faculty')
 def upload_material():
     form = StudyMaterialForm()
     # Populate subject choices
-    form.subject.choices = [(s.id, f"{s.code} - {s.name}") for s in Subject.query.all()]
+    form.subject.choices = reference_data().subject_choices
     
     if form.validate_on_submit():
         file = form.file.data
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            # Create unique filename
-            base, ext = os.path.splitext(filename)
-            filename = f"{base}_{current_user.id}_{form.subject.data}{ext}"
-            
-            # Save file
-            file_path = os.path.join('uploads', 'materials', filename)
-            os.makedirs(os.path.dirname(os.path.join(current_app.root_path, 'static', file_path)), exist_ok=True)
-            file.save(os.path.join(current_app.root_path, 'static', file_path))
-            
-            # Create database entry
-            material = StudyMaterial(
-                title=form.title.data,
-                description=form.description.data,
-                material_type=form.material_type.data,
-                file_path=file_path,
-                subject_id=form.subject.data,
-                faculty_id=current_user.id
-            )
-            db.session.add(material)
+            # Identical files share one stored copy, whoever uploads them and for which subject
+            sha256, size = get_storage().save(file.stream)
+            _create_material(form, sha256, size, file.filename)
             db.session.commit()
             
             flash('Study material uploaded successfully!', 'success')
@@ -51,33 +67,156 @@ def upload_material():
             
     return render_template('study_material/upload.html', form=form)
 
+# Chunked uploads for large files, used by static/js/chunked-upload.js
+
+def _get_upload(upload_id):
+    upload = db.session.get(UploadSession, upload_id)
+    if upload is None or upload.user_id != current_user.id:
+        abort(404)
+    return upload
+
+def _upload_status(upload):
+    return {
+        'id': upload.id,
+        'size': upload.size,
+        'chunk_size': upload.chunk_size,
+        'chunk_count': upload.chunk_count,
+        'received': upload.received(),
+    }
+
+@bp.errorhandler(UploadRejected)
+def upload_rejected(e):
+    return jsonify({'error': str(e)}), e.status
+
+@bp.route('/materials/uploads', methods=['POST'])
+@login_required
+@roles_required('faculty')
+def start_chunked_upload():
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(str(data.get('filename', '')))
+    if not allowed_file(filename):
+        raise UploadRejected('Only PDF and Office documents are allowed!')
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        raise UploadRejected('The file size is missing')
+    upload = start_upload(current_user.id, filename, size)
+    db.session.commit()
+    return jsonify(_upload_status(upload)), 201
+
+@bp.route('/materials/uploads/<upload_id>')
+@login_required
+@roles_required('faculty')
+def chunked_upload_status(upload_id):
+    return jsonify(_upload_status(_get_upload(upload_id)))
+
+@bp.route('/materials/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@login_required
+@roles_required('faculty')
+def put_upload_chunk(upload_id, index):
+    upload = _get_upload(upload_id)
+    write_chunk(upload, index, request.stream, request.headers.get('X-Chunk-SHA256'))
+    db.session.commit()
+    return jsonify({'index': index, 'received': len(upload.received())})
+
+@bp.route('/materials/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+@roles_required('faculty')
+def complete_chunked_upload(upload_id):
+    upload = _get_upload(upload_id)
+    form = MaterialDetailsForm()
+    form.subject.choices = reference_data().subject_choices
+    if not form.validate_on_submit():
+        return jsonify({'error': 'Please correct the form', 'errors': form.errors}), 400
+    
+    filename = upload.filename
+    sha256, size = finish_upload(upload)
+    _create_material(form, sha256, size, filename)
+    db.session.commit()
+    
+    flash('Study material uploaded successfully!', 'success')
+    return jsonify({'redirect': url_for('study_material.list_materials')})
+
 @bp.route('/materials')
 def list_materials():
     subject_id = request.args.get('subject_id', type=int)
     material_type = request.args.get('type')
+    cursor = request.args.get('cursor')
+    before = request.args.get('before')
+    for token in (cursor, before):
+        if token:
+            try:
+                decode_cursor(token)
+            except InvalidCursor:
+                abort(400)
     
-    query = StudyMaterial.query
+    query = StudyMaterial.query.options(
+        joinedload(StudyMaterial.subject), joinedload(StudyMaterial.faculty))
     if subject_id:
         query = query.filter_by(subject_id=subject_id)
     if material_type:
         query = query.filter_by(material_type=material_type)
-        
-    materials = query.order_by(StudyMaterial.upload_date.desc()).all()
-    subjects = Subject.query.all()
+    
+    # Keyset pages, newest upload first. The page is fetched inside a cached
+    # fragment, so only on a miss
+    def load_page():
+        return keyset_page(query, StudyMaterial, cursor, key='upload_date', before=before,
+                           limit=current_app.config['MATERIALS_PAGE_SIZE'])
     
     return render_template('study_material/list.html', 
-                         materials=materials, 
-                         subjects=subjects,
+                         load_page=load_page,
+                         subject_tree=subject_tree(),
                          current_subject=subject_id,
-                         current_type=material_type)
+                         current_type=material_type,
+                         cursor=cursor,
+                         before=before)
+
+@bp.route('/materials/search')
+def search():
+    query = request.args.get('q', '').strip()
+    results = search_materials(query) if query else []
+    return render_template('study_material/search.html', query=query, results=results)
 
 @bp.route('/materials/<int:id>')
 def view_material(id):
     material = StudyMaterial.query.get_or_404(id)
-    return render_template('study_material/view.html', material=material)
+    return render_conditional('study_material/view.html', material.upload_date,
+                              'material', material.id, material.upload_date, material=material)
 
 @bp.route('/materials/<int:id>/download')
+@login_required
 def download_material(id):
     material = StudyMaterial.query.get_or_404(id)
-    directory = os.path.join(current_app.root_path, 'static', 'uploads', 'materials')
-    return send_from_directory(directory, os.path.basename(material.file_path))
+    if material.blob_sha256:
+        return redirect(url_for('study_material.download_blob', sha256=material.blob_sha256,
+                                filename=material.original_filename))
+    # Uploaded before content-addressed storage
+    return send_upload(os.path.join(MATERIALS_DIR, os.path.basename(material.file_path)))
+
+@bp.route('/materials/files/<string(length=64):sha256>/<filename>')
+@login_required
+def download_blob(sha256, filename):
+    # The URL names the content, so the browser can keep it forever; shared caches must not
+    blob = db.session.get(Blob, sha256)
+    if blob is None or blob.ref_count <= 0:
+        abort(404)
+    return send_upload(get_storage().relative_path(sha256), download_name=secure_filename(filename),
+                       max_age=BLOB_MAX_AGE)
+
+@bp.route('/materials/<int:id>/delete', methods=['POST'])
+@login_required
+def delete_material(id):
+    material = StudyMaterial.query.get_or_404(id)
+    if not (current_user.has_role('admin') or material.faculty_id == current_user.id):
+        abort(403)
+    
+    # The stored file is removed by `flask blobs-gc` once no material uses it
+    if material.blob_sha256:
+        Blob.release(material.blob_sha256)
+    remove_material(material.id)
+    db.session.delete(material)
+    invalidate('materials')
+    db.session.commit()
+    
+    flash('Study material deleted.', 'success')
+    return redirect(url_for('study_material.list_materials'))
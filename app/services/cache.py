@@ -0,0 +1,196 @@
+"""Cache for derived data and rendered template fragments of read-mostly pages.
+
+Entries live in a pluggable backend chosen by CACHE_TYPE: 'memory' (a
+per-process LRU), 'filesystem' (shared by the workers of one host) or
+'null'. Invalidation is by tag: an entry is stored under the current
+versions of its tags, which are DataVersion rows, so code that changes the
+data calls ``invalidate`` with the tags in the same transaction and every
+process stops reading the old entries once it commits. Stale entries are
+never read again and age out of the backend.
+
+Tags in use: 'materials' (study materials), 'subjects', 'results' (any
+result) and 'results:<student_id>' (one student's results).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from flask_security import current_user
+from markupsafe import Markup
+from sqlalchemy import event
+from ..models.data_version import DataVersion
+
+_MISSING = object()
+
+
+class MemoryCache:
+    """Least recently used entries of one process"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileSystemCache:
+    """Pickled entries in a directory, one file per key"""
+
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.cache')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        if expires_at < time.time():
+            return _MISSING
+        return value
+
+    def set(self, key, value, timeout):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((time.time() + timeout, value), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune()
+
+    def _prune(self):
+        """Drop the oldest files once there are more than max_entries"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.cache'):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass
+        entries.sort()
+        for _, path in entries[:max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.cache'):
+                os.unlink(os.path.join(self.directory, name))
+
+
+class NullCache:
+    """Caches nothing, for development and debugging"""
+
+    def get(self, key):
+        return _MISSING
+
+    def set(self, key, value, timeout):
+        pass
+
+    def clear(self):
+        pass
+
+
+def init_app(app):
+    cache_type = app.config['CACHE_TYPE']
+    if cache_type == 'memory':
+        backend = MemoryCache(app.config['CACHE_MAX_ENTRIES'])
+    elif cache_type == 'filesystem':
+        backend = FileSystemCache(app.config['CACHE_DIR'] or os.path.join(app.instance_path, 'cache'),
+                                  app.config['CACHE_MAX_ENTRIES'])
+    elif cache_type == 'null':
+        backend = NullCache()
+    else:
+        raise ValueError(f'Unknown CACHE_TYPE {cache_type!r}')
+    app.extensions['cache'] = backend
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
+
+
+def _make_key(key, tags, per_user):
+    parts = [key if isinstance(key, str) else ':'.join(map(str, key))]
+    if per_user:
+        parts.append(f'user={current_user.id}' if current_user.is_authenticated else 'user=-')
+    versions = DataVersion.get_many(tags)
+    parts.extend(f'{tag}@{versions[tag]}' for tag in sorted(versions))
+    return '|'.join(parts)
+
+
+def cached(key, build, tags=(), per_user=False, timeout=None):
+    """Return the entry for ``key``, calling ``build()`` to create it on a miss.
+
+    ``key`` is a string or a tuple of parts. The entry is dropped once any of
+    ``tags`` is invalidated or after ``timeout`` seconds (CACHE_DEFAULT_TIMEOUT
+    by default). Entries for pages that differ per user must pass
+    ``per_user=True``. Values must be picklable for the filesystem backend.
+    """
+    backend = current_app.extensions['cache']
+    full_key = _make_key(key, tags, per_user)
+    value = backend.get(full_key)
+    if value is _MISSING:
+        value = build()
+        backend.set(full_key, value, timeout or current_app.config['CACHE_DEFAULT_TIMEOUT'])
+    return value
+
+
+def invalidate(*tags):
+    """Retire every entry built from ``tags`` once the current transaction commits"""
+    DataVersion.bump(*tags)
+
+
+def invalidate_on_change(model, *tags):
+    """Invalidate ``tags`` whenever a row of ``model`` is inserted, updated or deleted through the ORM"""
+    def bump(mapper, connection, target):
+        DataVersion.bump(*tags, connection=connection)
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, bump)
+
+
+def cached_fragment(*key, tags=(), per_user=False, timeout=None, caller=None):
+    """Template helper caching the body of a call block::
+
+        {% call cached_fragment('materials', subject_id, tags=['materials']) %}
+            ...
+        {% endcall %}
+
+    The body is only rendered on a miss, so queries it iterates lazily are
+    skipped on a hit.
+    """
+    return Markup(cached(('fragment',) + key, lambda: str(caller()), tags, per_user, timeout))
@@ -0,0 +1,35 @@
+"""The subject catalog as a department -> semester -> subject tree.
+
+The tree is built with one query and cached under the 'subjects' tag, which
+any ORM write to subjects or departments invalidates, so pages that offer
+subject navigation do not query the catalog again until it changes.
+"""
+from itertools import groupby
+from ..extensions import db
+from ..models.department import Department
+from ..models.subject import Subject
+from .cache import cached, invalidate_on_change
+
+TREE_TIMEOUT = 24 * 3600  # Changes are picked up through the tag; this only bounds writes made in SQL
+
+invalidate_on_change(Subject, 'subjects')
+invalidate_on_change(Department, 'subjects')
+
+
+def _build_subject_tree():
+    rows = db.session.execute(
+        db.select(Department.name, Subject.semester, Subject.id, Subject.code, Subject.name)
+        .join(Department, Department.id == Subject.department_id)
+        .order_by(Department.name, Subject.semester, Subject.code)).all()
+    return [
+        (department, [
+            (semester, [(subject_id, code, name) for _, _, subject_id, code, name in subjects])
+            for semester, subjects in groupby(department_rows, key=lambda row: row[1])
+        ])
+        for department, department_rows in groupby(rows, key=lambda row: row[0])
+    ]
+
+
+def subject_tree():
+    """[(department name, [(semester, [(subject id, code, name), ...]), ...]), ...]"""
+    return cached('subject_tree', _build_subject_tree, tags=['subjects'], timeout=TREE_TIMEOUT)
@@ -0,0 +1,110 @@
+"""Resumable chunked uploads.
+
+The client starts a session with the file's name and size, PUTs the chunks
+in any order (each at most UPLOAD_CHUNK_SIZE bytes, optionally with its
+SHA-256 in an ``X-Chunk-SHA256`` header) and then finishes the session.
+Chunk bodies are streamed straight to their offset in a staging file under
+UPLOAD_FOLDER/chunked, so memory use does not depend on the file size. A
+client that lost its connection asks for the session and sends only the
+chunks that are missing. Sessions left unfinished for
+CHUNKED_UPLOAD_EXPIRY seconds are removed by ``flask blobs-gc``.
+"""
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from flask import current_app
+from ..extensions import db
+from ..models.upload_session import UploadSession, UploadChunk
+from .storage import get_storage
+
+STAGING_DIR = 'chunked'  # Under UPLOAD_FOLDER, so finished files can be renamed into blob storage
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadRejected(ValueError):
+    """An upload request that cannot be accepted; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def staging_path(upload):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], STAGING_DIR, f'{upload.id}.part')
+
+
+def start_upload(user_id, filename, size):
+    """Open an upload session for a file of ``size`` bytes"""
+    max_size = current_app.config['MATERIAL_MAX_SIZE']
+    if size <= 0:
+        raise UploadRejected('The file is empty')
+    if size > max_size:
+        raise UploadRejected(f'The file is larger than {max_size // (1024 * 1024)} MB', status=413)
+
+    upload = UploadSession(id=secrets.token_hex(16), user_id=user_id, filename=filename, size=size,
+                           chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'])
+    path = staging_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.truncate(size)  # Sparse on most filesystems; chunks fill it in place
+    db.session.add(upload)
+    return upload
+
+
+def write_chunk(upload, index, stream, sha256=None):
+    """Stream chunk ``index`` from ``stream`` into the staging file and record it.
+
+    The chunk must have exactly its expected length and, when ``sha256`` is
+    given, that digest; otherwise it is not recorded and has to be sent again.
+    """
+    if not 0 <= index < upload.chunk_count:
+        raise UploadRejected(f'Chunk {index} is out of range')
+    expected = upload.chunk_length(index)
+
+    digest = hashlib.sha256()
+    written = 0
+    with open(staging_path(upload), 'r+b') as f:
+        f.seek(index * upload.chunk_size)
+        while written <= expected:
+            block = stream.read(min(BLOCK_SIZE, expected + 1 - written))
+            if not block:
+                break
+            if written + len(block) > expected:
+                raise UploadRejected(f'Chunk {index} is larger than {expected} bytes')
+            digest.update(block)
+            f.write(block)
+            written += len(block)
+    if written != expected:
+        raise UploadRejected(f'Chunk {index} has {written} bytes, expected {expected}')
+    if sha256 and sha256.lower() != digest.hexdigest():
+        raise UploadRejected(f'Chunk {index} does not match its checksum', status=422)
+
+    db.session.merge(UploadChunk(session_id=upload.id, index=index, size=written,
+                                 sha256=digest.hexdigest()))
+    upload.updated_at = datetime.utcnow()
+
+
+def finish_upload(upload):
+    """Move a complete upload into blob storage and close the session; returns (sha256, size)"""
+    missing = set(range(upload.chunk_count)) - set(upload.received())
+    if missing:
+        raise UploadRejected(f'{len(missing)} chunk(s) missing, first {min(missing)}', status=409)
+    sha256, size = get_storage().save_file(staging_path(upload))
+    db.session.delete(upload)
+    return sha256, size
+
+
+def expire_uploads(max_age=None):
+    """Delete sessions idle for more than ``max_age`` seconds, with their staging files"""
+    max_age = max_age if max_age is not None else current_app.config['CHUNKED_UPLOAD_EXPIRY']
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+    expired = db.session.scalars(db.select(UploadSession).where(UploadSession.updated_at < cutoff)).all()
+    for upload in expired:
+        try:
+            os.unlink(staging_path(upload))
+        except FileNotFoundError:
+            pass
+        db.session.delete(upload)
+    db.session.commit()
+    return len(expired)
@@ -0,0 +1,56 @@
+"""Conditional GET for pages derived from a single row.
+
+A page gets a weak ETag built from the row's version and the viewer (their
+id and ``updated_at``, which covers the navigation, and the session's CSRF
+token, which every page embeds), plus a Last-Modified. When the browser
+revalidates a copy that is still current, a bodiless 304 is returned
+without rendering the template.
+"""
+import hashlib
+from flask import make_response, render_template, request, session
+from flask_security import current_user
+
+
+def page_etag(*version):
+    """Weak ETag value for a page built from ``version`` for the current viewer"""
+    viewer = (current_user.id, current_user.updated_at) if current_user.is_authenticated else None
+    key = repr((version, viewer, session.get('csrf_token')))
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def render_conditional(template_name, last_modified, *version, **context):
+    """Render ``template_name``, or answer 304 if the client's copy is current.
+
+    ``version`` identifies the state of the data on the page, e.g. the row's
+    id and ``updated_at``; ``last_modified`` is the newest of its timestamps.
+    """
+    stamps = [last_modified]
+    if current_user.is_authenticated:
+        stamps.append(current_user.updated_at)
+    stamps = [stamp for stamp in stamps if stamp]
+    last_modified = max(stamps).replace(microsecond=0) if stamps else None
+    etag = page_etag(*version)
+
+    # A pending flash message has to be rendered, so the page is sent in full
+    if '_flashes' not in session:
+        if request.if_none_match:
+            fresh = request.if_none_match.contains_weak(etag)
+        else:
+            fresh = bool(last_modified and request.if_modified_since
+                         and last_modified <= request.if_modified_since.replace(tzinfo=None))
+        if fresh:
+            response = make_response('', 304)
+            return _set_validators(response, etag, last_modified)
+
+    response = make_response(render_template(template_name, **context))
+    # Rendering may have created the session's CSRF token, so the tag is taken afterwards
+    return _set_validators(response, page_etag(*version), last_modified)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,27 @@
+"""Chunked CSV reading shared by the importers.
+
+Uploads are read a chunk of rows at a time with an explicit dtype map, so
+columns the importer does not store are never materialised and peak memory
+is bounded by the chunk size rather than the file size.
+"""
+import pandas as pd
+from flask import current_app
+
+
+def read_csv_chunks(source, dtypes, chunksize=None):
+    """Yield DataFrames of at most ``chunksize`` rows holding only the columns in ``dtypes``"""
+    chunksize = chunksize or current_app.config['IMPORT_CHUNK_SIZE']
+    return pd.read_csv(source, usecols=lambda column: column in dtypes,
+                       dtype=dtypes, chunksize=chunksize)
+
+
+def count_csv_rows(f):
+    """Count the data rows in a binary CSV file object without parsing it, for progress reporting"""
+    lines = 0
+    last = b'\n'
+    for block in iter(lambda: f.read(1024 * 1024), b''):
+        lines += block.count(b'\n')
+        last = block[-1:]
+    if last != b'\n':
+        lines += 1  # Final line without a trailing newline
+    return max(lines - 1, 0)  # Minus the header
@@ -0,0 +1,53 @@
+"""Delivery of private files kept under UPLOAD_FOLDER.
+
+Views authorize the request and then hand the file to ``send_upload``. With
+MATERIAL_DELIVERY set to 'x-accel' the response is empty and carries an
+``X-Accel-Redirect`` to nginx's internal uploads location, so nginx streams
+the bytes (with Range and sendfile) and the worker is free at once. The
+default 'send_file' streams from Python with conditional and Range request
+support, using the server's sendfile file wrapper where there is one; it is
+meant for development.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+from flask import abort, current_app, send_file
+from werkzeug.security import safe_join
+
+DELIVERY_MODES = ('send_file', 'x-accel')
+
+
+def send_upload(relative_path, download_name=None, as_attachment=False, max_age=None):
+    """Response delivering ``relative_path`` under UPLOAD_FOLDER, 404 if it is missing.
+
+    Pass ``max_age`` only for paths whose content never changes, such as
+    blobs; the response is then cacheable as immutable, by the browser only
+    since views restrict who may download.
+    """
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], relative_path)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    download_name = download_name or os.path.basename(path)
+
+    mode = current_app.config['MATERIAL_DELIVERY']
+    if mode == 'send_file':
+        response = send_file(path, download_name=download_name, as_attachment=as_attachment,
+                             conditional=True)
+    elif mode == 'x-accel':
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(download_name)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = '/'.join([
+            current_app.config['X_ACCEL_UPLOADS_LOCATION'].rstrip('/'),
+            quote(relative_path.replace(os.sep, '/')),
+        ])
+        response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline',
+                             filename=download_name)
+    else:
+        raise ValueError(f'Unknown MATERIAL_DELIVERY {mode!r}, expected one of {DELIVERY_MODES}')
+
+    if max_age is not None:
+        response.cache_control.no_cache = None
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    return response
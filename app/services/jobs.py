@@ -0,0 +1,98 @@
+"""In-process background jobs for long-running imports.
+
+Jobs are tracked in the ``jobs`` table and executed on a thread pool owned by
+the application, so no broker is needed. Task functions receive the Job as
+their first argument, run inside an application context with their own
+session, and return a summary dict that is stored on the job. A task may
+also leave one file for the admin to download, see ``save_artifact``.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from flask_security import current_user
+from ..extensions import db
+from ..models.job import Job
+
+
+class JobRejected(Exception):
+    """Raised by a task to fail its job with a message for the admin, not a traceback"""
+
+
+def init_app(app):
+    app.extensions['jobs'] = ThreadPoolExecutor(
+        max_workers=app.config['JOB_WORKERS'],
+        thread_name_prefix='job',
+    )
+
+
+def submit_job(kind, func, *args, **kwargs):
+    """Create a Job row and run ``func(job, *args, **kwargs)`` off the request path."""
+    job = Job(kind=kind, status='queued',
+              created_by_id=current_user.id if current_user.is_authenticated else None)
+    db.session.add(job)
+    db.session.commit()
+    
+    app = current_app._get_current_object()
+    app.extensions['jobs'].submit(_run_job, app, job.id, func, args, kwargs)
+    return job
+
+
+def _run_job(app, job_id, func, args, kwargs):
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        
+        try:
+            summary = func(job, *args, **kwargs) or {}
+            job.status = 'succeeded'
+            job.result = summary
+            job.message = summary.get('message')
+        except JobRejected as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = 'failed'
+            job.message = str(e)[:255]
+        except Exception as e:
+            app.logger.exception(f'Job {job_id} failed')
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = 'failed'
+            job.message = str(e)[:255]
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            db.session.remove()
+
+
+def artifact_path(job):
+    folder = (current_app.config['JOB_ARTIFACT_FOLDER']
+              or os.path.join(current_app.config['UPLOAD_FOLDER'], 'job_artifacts'))
+    return os.path.join(folder, f'job-{job.id}')
+
+
+def save_artifact(job, name, data):
+    """Store ``data`` (bytes) as the job's downloadable file, named ``name``.
+
+    The file is only readable by the app user and is removed once downloaded.
+    """
+    path = artifact_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    job.artifact = name
+
+
+def pop_artifact(job):
+    """Read and delete the job's file; returns (name, data) or None if it is gone"""
+    path = artifact_path(job)
+    if not job.artifact or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    os.remove(path)
+    name, job.artifact = job.artifact, None
+    return name, data
@@ -0,0 +1,70 @@
+"""Keyset pagination for the admin lists.
+
+Pages are ordered newest first on ``(<key>, id)``, ``created_at`` unless
+another column is given. A cursor is an opaque token holding the sort key
+of a row on the page boundary, so each page is a range read on that index
+however deep the client has paged, and rows inserted meanwhile do not
+shift the pages already sent. The key column must not be NULL.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import current_app, request
+from ..extensions import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, id):
+    payload = json.dumps([value.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, id = json.loads(payload)
+        return datetime.fromisoformat(value), int(id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}') from e
+
+
+def page_size():
+    """The ``limit`` query argument, defaulting to and capped by the app config"""
+    limit = request.args.get('limit', current_app.config['ADMIN_PAGE_SIZE'], type=int)
+    return max(1, min(limit, current_app.config['ADMIN_MAX_PAGE_SIZE']))
+
+
+def keyset_page(query, model, cursor=None, limit=None, key='created_at', before=None):
+    """Return one page of ``query`` as ``(items, next_cursor, prev_cursor)``.
+
+    ``cursor`` continues after (older than) a row, ``before`` goes back to the
+    page preceding (newer than) a row. Either returned cursor is None at that
+    end of the list.
+    """
+    limit = limit or current_app.config['ADMIN_PAGE_SIZE']
+    column = getattr(model, key)
+    sort_key = db.tuple_(column, model.id)
+
+    if before:
+        # Walk backwards from the boundary row, then restore newest-first order
+        query = query.filter(sort_key > decode_cursor(before))
+        items = query.order_by(column.asc(), model.id.asc()).limit(limit + 1).all()
+        has_prev, has_next = len(items) > limit, True
+        items = items[:limit][::-1]
+    else:
+        if cursor:
+            query = query.filter(sort_key < decode_cursor(cursor))
+        # One extra row tells us whether there is a next page
+        items = query.order_by(column.desc(), model.id.desc()).limit(limit + 1).all()
+        has_prev, has_next = bool(cursor), len(items) > limit
+        items = items[:limit]
+
+    if not items:
+        return items, None, None
+    next_cursor = encode_cursor(getattr(items[-1], key), items[-1].id) if has_next else None
+    prev_cursor = encode_cursor(getattr(items[0], key), items[0].id) if has_prev else None
+    return items, next_cursor, prev_cursor
@@ -0,0 +1,76 @@
+"""Password hashing spread over a process pool, for bulk account provisioning.
+
+Each hash is a full bcrypt/argon2 round at the configured cost, so hashing a
+few thousand passwords on one core takes minutes. PasswordHasher produces
+exactly what ``flask_security.utils.hash_password`` would: the cheap HMAC
+pre-hash runs in the parent, and the expensive round runs in worker
+processes. Workers rebuild the password CryptContext from its serialized
+config and receive no application state.
+"""
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from flask import current_app
+from flask_security.utils import config_value, get_hmac, use_double_hash
+
+# Per worker process: serialized CryptContext config -> CryptContext
+_contexts = {}
+
+
+def _hash_in_worker(context_config, options, password):
+    context = _contexts.get(context_config)
+    if context is None:
+        from passlib.context import CryptContext
+        context = _contexts[context_config] = CryptContext.from_string(context_config)
+    return context.hash(password, **options)
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))  # Respects container CPU sets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def generate_password(length=12):
+    """A random temporary password of URL-safe characters"""
+    return secrets.token_urlsafe(length)[:length]
+
+
+class PasswordHasher:
+    """Hash many passwords in parallel; use as a context manager around a bulk import.
+
+    ``workers`` defaults to PASSWORD_HASH_WORKERS, or one per available CPU
+    when that is 0. With a single worker everything runs in-process.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or current_app.config['PASSWORD_HASH_WORKERS'] or _available_cpus()
+        self.context_config = current_app.extensions['security'].pwd_context.to_string()
+        self.options = config_value('PASSWORD_HASH_OPTIONS', default={}).get(
+            config_value('PASSWORD_HASH'), {})
+        self.pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            # spawn, not fork: the importing process runs request and job threads
+            self.pool = ProcessPoolExecutor(self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    def hash(self, passwords):
+        """Hash passwords, returning the hashes in the same order"""
+        if use_double_hash():
+            passwords = [get_hmac(password).decode('ascii') for password in passwords]
+        args = (repeat(self.context_config), repeat(self.options), passwords)
+        if not self.pool or len(passwords) < 2:
+            return list(map(_hash_in_worker, *args))
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self.pool.map(_hash_in_worker, *args, chunksize=chunksize))
@@ -0,0 +1,169 @@
+"""Columnar project fair imports from the Google Form responses export."""
+from datetime import datetime
+import pandas as pd
+from ..extensions import db
+from ..models.project import Project
+from ..models.department import Department
+from ..models.dashboard_stats import DashboardStats
+from ..models.import_ledger import ImportedFile, ImportedRow
+from .csv_stream import read_csv_chunks
+from .import_ledger import hash_rows, unchanged_rows, ledger_entries
+from .validation import validate_csv, reject_invalid, dry_run_summary, blank
+
+# Google Form responses column -> Project field
+FORM_COLUMNS = {
+    'Timestamp': 'submission_timestamp',
+    'Project Title': 'name',
+    'Write about your Idea/project ': 'description',
+    'Demo Model  / Poster ': 'presentation_type',
+    'Select Branch ': 'department',
+    'Select Semester': 'semester',
+    'First team member name  (for certificate printing)': 'group_leader',
+    'Mobile number any one team member': 'mobile_number',
+    'Faculty Mentor Name': 'faculty_mentor'
+}
+
+MEMBER_COLUMNS = [
+    'First team member name  (for certificate printing)',
+    'Second team member name  (for certificate printing)',
+    'Third team member name  (for certificate printing)',
+    'Forth team member name  (for certificate printing)',
+    'Fifth team member name  (for certificate printing)'
+]
+
+FORM_DTYPES = dict.fromkeys(list(FORM_COLUMNS) + MEMBER_COLUMNS, str)
+
+FORM_TIMESTAMP_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+# Answers the importer needs on every row
+REQUIRED_ANSWERS = [
+    'Timestamp',
+    'Project Title',
+    'Write about your Idea/project ',
+    'Demo Model  / Poster ',
+    'Select Branch ',
+    'Select Semester',
+    'First team member name  (for certificate printing)',
+    'Faculty Mentor Name',
+]
+
+
+def check_project_rows(chunk, report):
+    """Validation check for a Google Form responses CSV chunk"""
+    report.require(chunk, *REQUIRED_ANSWERS)
+    timestamps = chunk['Timestamp']
+    parsed = pd.to_datetime(timestamps, format=FORM_TIMESTAMP_FORMAT, errors='coerce')
+    report.flag(chunk, ~blank(timestamps) & parsed.isna(), 'Timestamp',
+                'Not a timestamp like 12/31/2024 17:30:00')
+    for column, field in FORM_COLUMNS.items():
+        model_column = Department.name if field == 'department' else Project.__table__.c[field]
+        length = getattr(model_column.type, 'length', None)
+        if length:
+            report.max_length(chunk, column, length)
+
+
+def join_members(members):
+    """Join the non-blank member names of each row with ', '"""
+    names = members.apply(lambda column: column.str.strip())
+    names = names.where(names.notna() & names.ne(''))
+    joined = names.stack(future_stack=True).dropna().groupby(level=0).agg(', '.join)
+    return joined.reindex(members.index, fill_value='')
+
+
+def build_project_records(df):
+    """Compute the projects table rows for a chunk of form responses, as a DataFrame"""
+    records = pd.DataFrame({
+        field: df[column].str.strip()
+        for column, field in FORM_COLUMNS.items() if field not in ('submission_timestamp', 'mobile_number')
+    })
+    records['mobile_number'] = df['Mobile number any one team member']
+    records['submission_timestamp'] = pd.to_datetime(df['Timestamp'], format=FORM_TIMESTAMP_FORMAT)
+    records['members'] = join_members(df[MEMBER_COLUMNS])
+
+    department_ids = Department.resolve_ids(records['department'].dropna().unique())
+    records['department_id'] = records.pop('department').map(department_ids)
+    return records
+
+
+def project_keys(chunk):
+    """Natural key of each response for the import ledger: submission time and title"""
+    timestamps = pd.to_datetime(chunk['Timestamp'], format=FORM_TIMESTAMP_FORMAT)
+    return timestamps.dt.strftime('%Y-%m-%dT%H:%M:%S') + '|' + chunk['Project Title'].str.strip()
+
+
+def import_project_csv(source, chunksize=None, on_chunk=None, skip_unchanged=True):
+    """Import the projects in a validated responses CSV with one INSERT per chunk.
+
+    A response already in the import ledger updates the project created from
+    it instead of adding a duplicate, and is skipped altogether when its
+    content is unchanged (unless ``skip_unchanged`` is false). Marks given
+    since are kept. Everything is written in a single transaction that the
+    caller commits. ``on_chunk(processed_rows)`` is called after each chunk.
+    Returns ``inserted``, ``updated`` and ``unchanged`` counts.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    processed_rows = 0
+    now = datetime.utcnow()
+    for chunk in read_csv_chunks(source, FORM_DTYPES, chunksize):
+        processed_rows += len(chunk)
+        keys = project_keys(chunk)
+        hashes = hash_rows(chunk)
+        unchanged, entries = unchanged_rows('projects', keys, hashes)
+        if skip_unchanged:
+            counts['unchanged'] += int(unchanged.sum())
+            chunk, keys, hashes = chunk[~unchanged], keys[~unchanged], hashes[~unchanged]
+        # A team that answered twice: the last answer wins
+        last = ~keys.duplicated(keep='last')
+        chunk, keys, hashes = chunk[last], keys[last], hashes[last]
+        
+        if len(chunk):
+            records = build_project_records(chunk)
+            records = records.astype(object).where(records.notna(), None)
+            record_ids = keys.map(lambda key: entries.get(key, (None, None))[1]).astype(object)
+            # Projects deleted since their last import are inserted again
+            live_ids = set(db.session.scalars(
+                db.select(Project.id).where(Project.id.in_(record_ids.dropna().tolist()))))
+            record_ids = record_ids.where(record_ids.isin(live_ids), None)
+            existing = record_ids.notna()
+            
+            updates = [dict(row, id=record_id, updated_at=now) for row, record_id
+                       in zip(records[existing].to_dict('records'), record_ids[existing])]
+            if updates:
+                db.session.execute(db.update(Project), updates)
+            inserts = [dict(row, marks=None, created_at=now, updated_at=now)
+                       for row in records[~existing].to_dict('records')]
+            if inserts:
+                record_ids[~existing] = db.session.scalars(
+                    db.insert(Project).returning(Project.id, sort_by_parameter_order=True), inserts).all()
+            ImportedRow.store('projects', ledger_entries(keys, hashes, record_ids))
+            counts['inserted'] += len(inserts)
+            counts['updated'] += len(updates)
+        if on_chunk:
+            on_chunk(processed_rows)
+    if counts['inserted'] or counts['updated']:
+        DashboardStats.refresh('users')  # Responses may add departments
+    return counts
+
+
+def import_project_file(job, upload, dry_run=False, force=False):
+    """Job task: validate and import the projects in a staged responses CSV upload, then discard it.
+
+    Importing the file imported last again changes nothing, so it is not
+    read; ``force`` rewrites every row regardless.
+    """
+    with upload, upload.open() as f:
+        if not (dry_run or force) and ImportedFile.is_current('projects', upload.sha256):
+            return {'already_imported': True,
+                    'message': 'This file was already imported; nothing has changed.'}
+        report = validate_csv(f, FORM_DTYPES, list(FORM_DTYPES), check_project_rows)
+        reject_invalid(job, report)
+        if dry_run:
+            return dry_run_summary(report)
+        job.update_progress(total_rows=report.rows)
+        counts = import_project_csv(
+            f, on_chunk=lambda processed: job.update_progress(processed_rows=processed),
+            skip_unchanged=not force)
+        ImportedFile.record('projects', upload.sha256, upload.filename, report.rows)
+    counts['message'] = (f"{counts['inserted']} new projects, {counts['updated']} updated, "
+                         f"{counts['unchanged']} unchanged.")
+    return counts
@@ -0,0 +1,78 @@
+"""In-process snapshot of the reference data that forms offer as choices.
+
+Departments, roles and subjects change rarely but are listed on every
+register, profile, user and upload form. Each process keeps them as plain
+tuples and reloads them only when the 'subjects' or 'roles' DataVersion
+moves, which any ORM write to those tables bumps. The versions are checked
+at most every REFERENCE_DATA_CHECK_INTERVAL seconds, so building a form
+normally runs no query at all; a write is seen by the other workers within
+that interval and by the writing process on its next request.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from ..extensions import db
+from ..models.data_version import DataVersion
+from ..models.department import Department
+from ..models.subject import Subject
+from ..models.user import Role
+from . import catalog  # Bumps 'subjects' on writes to subjects and departments
+from .cache import invalidate_on_change
+
+TAGS = ('subjects', 'roles')
+
+invalidate_on_change(Role, 'roles')
+
+
+class ReferenceData:
+    """One immutable snapshot, shared by the requests of a process"""
+
+    def __init__(self, versions):
+        self.versions = versions
+        self.departments = tuple(db.session.execute(
+            db.select(Department.id, Department.name).order_by(Department.name)).tuples())
+        self.roles = tuple(db.session.execute(
+            db.select(Role.name, Role.description).order_by(Role.id)).tuples())
+        self.subjects = tuple(db.session.execute(
+            db.select(Subject.id, Subject.code, Subject.name).order_by(Subject.code)).tuples())
+
+    @property
+    def subject_choices(self):
+        return [(subject_id, f'{code} - {name}') for subject_id, code, name in self.subjects]
+
+
+class _Holder:
+    def __init__(self):
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+def init_app(app):
+    app.extensions['reference_data'] = _Holder()
+
+
+def _expire(mapper, connection, target):
+    # Recheck on this process's next call instead of waiting out the interval
+    current_app.extensions['reference_data'].checked_at = 0.0
+
+
+for model in (Department, Role, Subject):
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, _expire)
+
+
+def reference_data():
+    """The current ReferenceData, reloaded if another process changed it"""
+    holder = current_app.extensions['reference_data']
+    interval = current_app.config['REFERENCE_DATA_CHECK_INTERVAL']
+    if holder.snapshot is not None and time.monotonic() - holder.checked_at < interval:
+        return holder.snapshot
+    with holder.lock:
+        if holder.snapshot is None or time.monotonic() - holder.checked_at >= interval:
+            versions = DataVersion.get_many(TAGS)
+            if holder.snapshot is None or holder.snapshot.versions != versions:
+                holder.snapshot = ReferenceData(versions)
+            holder.checked_at = time.monotonic()
+    return holder.snapshot
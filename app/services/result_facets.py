@@ -0,0 +1,24 @@
+"""Filter options for the admin results list.
+
+The three DISTINCT scans over results are cached under the 'results' tag,
+so they are only repeated after a result import has committed.
+"""
+from ..extensions import db
+from ..models.result import Result
+from .cache import cached
+
+
+def _load_facets():
+    return {
+        'branches': [tuple(row) for row in db.session.query(Result.branch_code, Result.branch_name)
+                     .distinct().order_by(Result.branch_code)],
+        'exam_types': [exam_type for exam_type, in db.session.query(Result.exam_type).distinct()
+                       .order_by(Result.exam_type)],
+        'semesters': [semester for semester, in db.session.query(Result.semester).distinct()
+                      .order_by(Result.semester)],
+    }
+
+
+def result_facets():
+    """Branches, exam types and semesters present in the results table"""
+    return cached('result_facets', _load_facets, tags=['results'])
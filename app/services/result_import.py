@@ -0,0 +1,383 @@
+"""Columnar ingestion of GTU result CSV exports into the results and subject_results tables."""
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db
+from ..models.result import Result
+from ..models.subject_result import SubjectResult
+from ..models.data_version import DataVersion
+from ..models.dashboard_stats import DashboardStats
+from ..models.import_ledger import ImportedFile, ImportedRow
+from .cache import invalidate
+from .csv_stream import read_csv_chunks
+from .import_ledger import hash_rows, unchanged_rows, ledger_entries
+from .validation import validate_csv, reject_invalid, dry_run_summary, blank
+
+GRADE_POINTS = {
+    'AA': 10, 'AB': 9, 'BB': 8, 'BC': 7, 'CC': 6, 'CD': 5, 'DD': 4, 'FF': 0
+}
+
+# Grades accepted on upload: the graded codes plus PS, a pass in a subject without credits
+KNOWN_GRADES = set(GRADE_POINTS) | {'PS'}
+
+SUBJECT_SLOTS = range(1, 16)  # SUB1 to SUB15
+
+# CSV column -> Result attribute for the per-exam fields
+RESULT_COLUMNS = {
+    'St_Id': 'student_id',
+    'examid': 'exam_id',
+    'extype': 'exam_type',
+    'exam': 'exam_name',
+    'DECLARATIONDATE': 'declaration_date',
+    'AcademicYear': 'academic_year',
+    'sem': 'semester',
+    'instcode': 'institute_code',
+    'instName': 'institute_name',
+    'CourseName': 'course_name',
+    'BR_CODE': 'branch_code',
+    'BR_NAME': 'branch_name',
+}
+
+# SUBn column suffix -> SubjectResult attribute
+SUBJECT_COLUMNS = {
+    '': 'subject_code',
+    'NA': 'subject_name',
+    'CR': 'credits',
+    'GR': 'grade',
+    'GRTH': 'theory_grade',
+    'GRE': 'theory_ese_grade',
+    'GRM': 'theory_pa_grade',
+    'GRPR': 'practical_grade',
+    'GRV': 'practical_ese_grade',
+    'GRI': 'practical_pa_grade',
+}
+
+# Per-subject values stored in subject_results and compared on re-upload
+SUBJECT_FIELDS = ['slot'] + list(SUBJECT_COLUMNS.values()) + ['grade_points']
+
+# The only CSV columns read from a GTU export; everything is parsed as text
+# and converted explicitly in build_result_records
+RESULT_DTYPES = dict.fromkeys(
+    list(RESULT_COLUMNS)
+    + [f'SUB{i}{suffix}' for i in SUBJECT_SLOTS for suffix in SUBJECT_COLUMNS],
+    str,
+)
+
+# Columns every result file must have
+RESULT_REQUIRED = ['St_Id', 'examid', 'sem', 'DECLARATIONDATE']
+
+# Columns compared to decide whether an existing row changed, and rewritten on conflict
+UPSERT_COLUMNS = [
+    attr for attr in RESULT_COLUMNS.values() if attr not in ('student_id', 'exam_id')
+] + ['total_credits', 'total_grade_points', 'sgpa', 'result_status']
+
+# Dialects that support INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def _as_str(series):
+    """Cast a column to str while keeping missing values missing."""
+    return series.astype(object).where(series.isna(), series.astype(str))
+
+
+def melt_subjects(df):
+    """Reshape the SUBn column families into one row per subject.
+
+    The returned frame has a ``row`` column holding the positional index of the
+    source row, so per-student aggregates are a plain groupby away.
+    """
+    slots = [i for i in SUBJECT_SLOTS if f'SUB{i}' in df.columns]
+
+    def family(suffix):
+        columns = [f'SUB{i}{suffix}' for i in slots]
+        # Row-major ravel: row 0 slots 1..n, then row 1 slots 1..n, ...
+        return df.reindex(columns=columns).to_numpy(dtype=object).ravel()
+
+    subjects = pd.DataFrame({
+        'row': np.repeat(np.arange(len(df)), len(slots)),
+        'slot': np.tile(slots, len(df)),
+        **{attr: family(suffix) for suffix, attr in SUBJECT_COLUMNS.items()},
+    })
+    subjects = subjects[subjects['subject_code'].notna()].copy()
+    subjects['credits'] = pd.to_numeric(subjects['credits'], errors='coerce').fillna(0.0)
+    subjects['grade_points'] = subjects['grade'].map(GRADE_POINTS).fillna(0).astype(float)
+    return subjects
+
+
+def build_result_records(df):
+    """Compute the Result rows for a GTU result DataFrame.
+
+    Totals, SGPA and PASS/FAIL are computed as array operations over the
+    melted subjects. Rows missing a student, exam, semester or a parseable
+    declaration date are dropped;
+    the number dropped is returned alongside the records.
+    """
+    df = df.reset_index(drop=True)
+    subjects = melt_subjects(df)
+
+    subjects['weighted'] = subjects['credits'] * subjects['grade_points']
+    subjects['failed'] = subjects['grade'].eq('FF')
+    totals = subjects.groupby('row').agg(
+        total_credits=('credits', 'sum'),
+        total_grade_points=('weighted', 'sum'),
+        failed=('failed', 'any'),
+    ).reindex(range(len(df)), fill_value=0)
+
+    records = pd.DataFrame({
+        attr: df[column] if column in df.columns else None
+        for column, attr in RESULT_COLUMNS.items()
+    })
+    for attr in ('student_id', 'exam_id', 'institute_code', 'branch_code'):
+        records[attr] = _as_str(records[attr])
+    records['declaration_date'] = pd.to_datetime(records['declaration_date'],
+                                                 errors='coerce').dt.normalize()
+    records['semester'] = pd.to_numeric(records['semester'], errors='coerce')
+
+    total_credits = totals['total_credits'].to_numpy(dtype=float)
+    total_grade_points = totals['total_grade_points'].to_numpy(dtype=float)
+    records['total_credits'] = total_credits
+    records['total_grade_points'] = total_grade_points
+    records['sgpa'] = np.divide(total_grade_points, total_credits,
+                                out=np.zeros_like(total_grade_points),
+                                where=total_credits > 0)
+    records['result_status'] = np.where(totals['failed'].astype(bool), 'FAIL', 'PASS')
+
+    # Each record carries its subject rows, in slot order, for subject_results
+    subject_rows = subjects[['row'] + SUBJECT_FIELDS]
+    subject_rows = subject_rows.astype(object).where(subject_rows.notna(), None)
+    per_row = [[] for _ in range(len(df))]
+    for subject in subject_rows.to_dict('records'):
+        per_row[subject.pop('row')].append(subject)
+    records['subjects'] = per_row
+
+    valid = records[['student_id', 'exam_id', 'semester', 'declaration_date']].notna().all(axis=1)
+    skipped = int((~valid).sum())
+    records = records[valid].copy()
+    records['semester'] = records['semester'].astype(int)
+
+    # The same student may appear twice in a file; the last row wins
+    records = records.drop_duplicates(subset=['student_id', 'exam_id'], keep='last')
+    return records, skipped
+
+
+def check_result_rows(chunk, report):
+    """Validation check for a GTU result CSV chunk"""
+    report.require(chunk, *RESULT_REQUIRED)
+    report.numeric(chunk, 'sem')
+    dates = chunk['DECLARATIONDATE']
+    report.flag(chunk, ~blank(dates) & pd.to_datetime(dates, errors='coerce').isna(),
+                'DECLARATIONDATE', 'Not a date')
+    for i in SUBJECT_SLOTS:
+        if f'SUB{i}' not in chunk:
+            continue
+        has_subject = chunk[f'SUB{i}'].notna()
+        if f'SUB{i}CR' in chunk:
+            report.numeric(chunk, f'SUB{i}CR', where=has_subject)
+        if f'SUB{i}GR' in chunk:
+            grades = chunk[f'SUB{i}GR']
+            report.flag(chunk, has_subject & grades.notna() & ~grades.isin(KNOWN_GRADES),
+                        f'SUB{i}GR', 'Unknown grade code')
+
+
+def _to_mappings(records):
+    """Convert a records DataFrame into plain dicts with None for missing values."""
+    records = records.astype(object).where(records.notna(), None)
+    return records.to_dict('records')
+
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key_filter(batch):
+    table = Result.__table__
+    return (table.c.exam_id.in_({m['exam_id'] for m in batch}),
+            table.c.student_id.in_({m['student_id'] for m in batch}))
+
+
+def _fetch_existing(batch):
+    """Load the stored rows matching a batch of mappings, keyed on (student_id, exam_id).
+
+    Returns the result rows and their stored subjects, grouped by result id.
+    """
+    table = Result.__table__
+    columns = [table.c.id, table.c.student_id, table.c.exam_id] + [table.c[c] for c in UPSERT_COLUMNS]
+    rows = db.session.execute(db.select(*columns).where(*_key_filter(batch))).mappings().all()
+    existing = {(str(row['student_id']), row['exam_id']): row for row in rows}
+
+    stored_subjects = defaultdict(list)
+    if rows:
+        subjects = SubjectResult.__table__
+        query = db.select(subjects.c.result_id, *[subjects.c[c] for c in SUBJECT_FIELDS]) \
+            .where(subjects.c.result_id.in_([row['id'] for row in rows])) \
+            .order_by(subjects.c.result_id, subjects.c.slot)
+        for subject in db.session.execute(query).mappings():
+            stored_subjects[subject['result_id']].append({c: subject[c] for c in SUBJECT_FIELDS})
+    return existing, stored_subjects
+
+
+def _fetch_ids(batch):
+    table = Result.__table__
+    rows = db.session.execute(
+        db.select(table.c.id, table.c.student_id, table.c.exam_id).where(*_key_filter(batch)))
+    return {(str(student_id), exam_id): result_id for result_id, student_id, exam_id in rows}
+
+
+def _is_unchanged(mapping, row, stored_subjects):
+    return (all(mapping[c] == row[c] for c in UPSERT_COLUMNS)
+            and mapping['subjects'] == stored_subjects)
+
+
+def upsert_results(mappings, batch_size=None):
+    """Write result mappings keyed on (student_id, exam_id) in batches.
+
+    Each batch looks up its stored rows and subjects once so identical rows
+    can be skipped, then issues a single ``INSERT ... ON CONFLICT DO UPDATE``
+    for the rest on SQLite and PostgreSQL; other dialects fall back to ORM
+    bulk insert/update. The subject rows of every written result are then
+    replaced with one DELETE and one multi-row INSERT, and the cache tags of
+    the students concerned are invalidated. The caller owns the
+    transaction. Returns ``inserted``, ``updated`` and ``unchanged`` counts.
+    """
+    batch_size = batch_size or current_app.config['RESULT_UPSERT_BATCH_SIZE']
+    insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    now = datetime.utcnow()
+
+    for batch in _batched(mappings, batch_size):
+        existing, stored_subjects = _fetch_existing(batch)
+        inserts = []
+        updates = []
+        for mapping in batch:
+            row = existing.get((mapping['student_id'], mapping['exam_id']))
+            if row is None:
+                inserts.append(mapping)
+            elif _is_unchanged(mapping, row, stored_subjects[row['id']]):
+                counts['unchanged'] += 1
+            else:
+                updates.append(dict(mapping, id=row['id']))
+        counts['inserted'] += len(inserts)
+        counts['updated'] += len(updates)
+        if not inserts and not updates:
+            continue
+
+        def result_row(mapping, **extra):
+            return {k: v for k, v in mapping.items() if k not in ('subjects', 'id')} | extra
+
+        if insert is None:
+            db.session.bulk_insert_mappings(
+                Result, [result_row(m, created_at=now, updated_at=now) for m in inserts])
+            db.session.bulk_update_mappings(
+                Result, [result_row(m, id=m['id'], updated_at=now) for m in updates])
+        else:
+            # created_at is only used by the INSERT branch; ON CONFLICT keeps the stored value
+            stmt = insert(Result.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['student_id', 'exam_id'],
+                set_={c: stmt.excluded[c] for c in UPSERT_COLUMNS + ['updated_at']},
+            )
+            db.session.execute(stmt, [result_row(m, created_at=now, updated_at=now)
+                                      for m in inserts + updates])
+
+        invalidate(*{f"results:{m['student_id']}" for m in inserts + updates})
+
+        subjects = SubjectResult.__table__
+        if updates:
+            db.session.execute(subjects.delete().where(
+                subjects.c.result_id.in_([m['id'] for m in updates])))
+        result_ids = _fetch_ids(inserts + updates)
+        subject_rows = [
+            dict(subject, result_id=result_ids[(m['student_id'], m['exam_id'])])
+            for m in inserts + updates for subject in m['subjects']
+        ]
+        if subject_rows:
+            db.session.execute(subjects.insert(), subject_rows)
+
+    return counts
+
+
+def ingest_results(df, batch_size=None):
+    """Insert or update the results contained in a GTU result DataFrame.
+
+    The caller owns the transaction. Returns a dict with ``inserted``,
+    ``updated``, ``unchanged`` and ``skipped`` counts.
+    """
+    records, skipped = build_result_records(df)
+    summary = upsert_results(_to_mappings(records), batch_size)
+    summary['skipped'] = skipped
+    return summary
+
+
+def result_keys(chunk):
+    """Natural key of each source row for the import ledger"""
+    return chunk['St_Id'] + '|' + chunk['examid']
+
+
+def import_result_csv(source, chunksize=None, batch_size=None, on_chunk=None, skip_unchanged=True):
+    """Stream a GTU result CSV into the results table, committing once per chunk.
+
+    Rows the import ledger has seen with the same content are counted as
+    unchanged without being parsed, unless ``skip_unchanged`` is false; the
+    ledger is updated either way. ``on_chunk(processed_rows)`` is called
+    before each commit so progress can be saved in the same transaction.
+    Chunks that change any result bump the 'results' DataVersion, and the
+    dashboard figures are refreshed at the end. Returns the summed ingest
+    counts.
+    """
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+    processed_rows = 0
+    for chunk in read_csv_chunks(source, RESULT_DTYPES, chunksize):
+        processed_rows += len(chunk)
+        keys = result_keys(chunk)
+        hashes = hash_rows(chunk)
+        if skip_unchanged:
+            unchanged, _ = unchanged_rows('results', keys, hashes)
+            summary['unchanged'] += int(unchanged.sum())
+            chunk, keys, hashes = chunk[~unchanged], keys[~unchanged], hashes[~unchanged]
+        
+        if len(chunk):
+            counts = ingest_results(chunk, batch_size)
+            for key, count in counts.items():
+                summary[key] += count
+            if counts['inserted'] or counts['updated']:
+                DataVersion.bump('results')
+            ImportedRow.store('results', ledger_entries(keys, hashes))
+        if on_chunk:
+            on_chunk(processed_rows)
+        db.session.commit()
+    
+    if summary['inserted'] or summary['updated']:
+        DashboardStats.refresh('results')
+        db.session.commit()
+    return summary
+
+
+def import_result_file(job, upload, dry_run=False, force=False):
+    """Job task: validate and import a staged GTU result CSV upload, then discard it.
+
+    Importing the file imported last again changes nothing, so it is not
+    read; ``force`` rewrites every row regardless.
+    """
+    with upload, upload.open() as f:
+        if not (dry_run or force) and ImportedFile.is_current('results', upload.sha256):
+            return {'already_imported': True,
+                    'message': 'This file was already imported; nothing has changed.'}
+        report = validate_csv(f, RESULT_DTYPES, RESULT_REQUIRED, check_result_rows)
+        reject_invalid(job, report)
+        if dry_run:
+            return dry_run_summary(report)
+        job.update_progress(total_rows=report.rows)
+        summary = import_result_csv(
+            f, on_chunk=lambda processed: job.update_progress(processed_rows=processed),
+            skip_unchanged=not force)
+        ImportedFile.record('results', upload.sha256, upload.filename, report.rows)
+    summary['message'] = (f"{summary['inserted']} new, {summary['updated']} updated, "
+                          f"{summary['unchanged']} unchanged, {summary['skipped']} skipped.")
+    return summary
@@ -0,0 +1,209 @@
+"""Full-text search over study materials.
+
+Each material is indexed with its title, description, subject code and
+name, and faculty name. The backend follows the database: an FTS5 table on
+SQLite, a weighted tsvector with a GIN index on PostgreSQL, and a LIKE scan
+elsewhere. The index is updated in the transaction that adds or deletes a
+material; ``flask search-reindex`` rebuilds it, e.g. after subjects or
+faculty are renamed.
+
+The index table is created along with study_materials (``db.create_all``)
+and by migration 5a6c2e8d1f47 for existing databases.
+"""
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, event, text
+from sqlalchemy.orm import joinedload
+from ..extensions import db
+from ..models.study_material import StudyMaterial
+from ..models.subject import Subject
+from ..models.user import User
+
+# Highlight markers returned by the database, replaced by <mark> after escaping
+START, STOP = '\x02', '\x03'
+
+
+class SqliteSearch:
+    """FTS5 table keyed by material id, ranked with BM25"""
+
+    create = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS study_materials_fts USING fts5("
+        "title, description, subject, faculty, tokenize='porter unicode61')",
+    ]
+    drop = ['DROP TABLE IF EXISTS study_materials_fts']
+
+    def index(self, rows):
+        ids = [row['id'] for row in rows]
+        db.session.execute(text('DELETE FROM study_materials_fts WHERE rowid IN :ids')
+                           .bindparams(db.bindparam('ids', expanding=True)), {'ids': ids})
+        db.session.execute(text(
+            'INSERT INTO study_materials_fts (rowid, title, description, subject, faculty) '
+            'VALUES (:id, :title, :description, :subject, :faculty)'), rows)
+
+    def remove(self, material_id):
+        db.session.execute(text('DELETE FROM study_materials_fts WHERE rowid = :id'), {'id': material_id})
+
+    def clear(self):
+        db.session.execute(text('DELETE FROM study_materials_fts'))
+
+    def search(self, terms, limit):
+        # Every term must match, as a prefix; columns weighted title > subject > faculty > description
+        query = ' '.join(f'"{term}"*' for term in terms)
+        return db.session.execute(text(
+            "SELECT rowid, snippet(study_materials_fts, -1, :start, :stop, '…', 16) "
+            'FROM study_materials_fts WHERE study_materials_fts MATCH :query '
+            'ORDER BY bm25(study_materials_fts, 10.0, 1.0, 4.0, 2.0) LIMIT :limit'),
+            {'query': query, 'start': START, 'stop': STOP, 'limit': limit}).all()
+
+
+class PostgresSearch:
+    """Weighted tsvector per material with a GIN index, ranked with ts_rank"""
+
+    create = [
+        'CREATE TABLE IF NOT EXISTS study_materials_search ('
+        'material_id INTEGER PRIMARY KEY REFERENCES study_materials (id) ON DELETE CASCADE, '
+        'content TEXT NOT NULL, document TSVECTOR NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_study_materials_search_document '
+        'ON study_materials_search USING gin (document)',
+    ]
+    drop = ['DROP TABLE IF EXISTS study_materials_search']
+
+    def index(self, rows):
+        db.session.execute(text(
+            'INSERT INTO study_materials_search (material_id, content, document) '
+            "VALUES (:id, concat_ws(' ', :title, :subject, :description, :faculty), "
+            "setweight(to_tsvector('english', :title), 'A') || "
+            "setweight(to_tsvector('english', :subject), 'B') || "
+            "setweight(to_tsvector('english', :faculty), 'C') || "
+            "setweight(to_tsvector('english', :description), 'D')) "
+            'ON CONFLICT (material_id) DO UPDATE '
+            'SET content = excluded.content, document = excluded.document'), rows)
+
+    def remove(self, material_id):
+        db.session.execute(text('DELETE FROM study_materials_search WHERE material_id = :id'),
+                           {'id': material_id})
+
+    def clear(self):
+        db.session.execute(text('DELETE FROM study_materials_search'))
+
+    def search(self, terms, limit):
+        query = ' & '.join(f'{term}:*' for term in terms)
+        return db.session.execute(text(
+            'SELECT material_id, ts_headline(\'english\', content, query, '
+            "'StartSel=' || :start || ', StopSel=' || :stop || ', MaxWords=24, MinWords=8') "
+            "FROM study_materials_search, to_tsquery('english', :query) AS query "
+            'WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT :limit'),
+            {'query': query, 'start': START, 'stop': STOP, 'limit': limit}).all()
+
+
+class LikeSearch:
+    """Unindexed fallback for other databases: title and description LIKE every term"""
+
+    create = drop = []
+
+    def index(self, rows):
+        pass
+
+    def remove(self, material_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, terms, limit):
+        conditions = [
+            db.or_(StudyMaterial.title.ilike(f'%{term}%'), StudyMaterial.description.ilike(f'%{term}%'))
+            for term in terms
+        ]
+        rows = db.session.execute(
+            db.select(StudyMaterial.id, StudyMaterial.description).where(*conditions)
+            .order_by(StudyMaterial.upload_date.desc()).limit(limit))
+        return [(material_id, (description or '')[:200]) for material_id, description in rows]
+
+
+BACKENDS = {
+    'sqlite': SqliteSearch(),
+    'postgresql': PostgresSearch(),
+}
+
+# Create and drop the index table together with study_materials
+for dialect_name, dialect_backend in BACKENDS.items():
+    for statement in dialect_backend.create:
+        event.listen(StudyMaterial.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect_name))
+    for statement in dialect_backend.drop:
+        event.listen(StudyMaterial.__table__, 'before_drop', DDL(statement).execute_if(dialect=dialect_name))
+
+
+def _backend():
+    return BACKENDS.get(db.session.get_bind().dialect.name) or LikeSearch()
+
+
+def _document_rows(material_ids=None):
+    """Indexed text of materials, all of them if ``material_ids`` is None"""
+    # Users created by registration and imports only have first and last names
+    faculty_name = db.func.coalesce(
+        db.func.nullif(User.name, ''),
+        db.func.trim(db.func.coalesce(User.first_name, '') + ' ' + db.func.coalesce(User.last_name, '')))
+    stmt = (
+        db.select(StudyMaterial.id, StudyMaterial.title, StudyMaterial.description,
+                  db.func.coalesce(Subject.code, '') + ' ' + db.func.coalesce(Subject.name, ''),
+                  faculty_name)
+        .outerjoin(Subject, Subject.id == StudyMaterial.subject_id)
+        .outerjoin(User, User.id == StudyMaterial.faculty_id)
+    )
+    if material_ids is not None:
+        stmt = stmt.where(StudyMaterial.id.in_(material_ids))
+    return [
+        {'id': material_id, 'title': title, 'description': description or '',
+         'subject': subject.strip(), 'faculty': faculty or ''}
+        for material_id, title, description, subject, faculty in db.session.execute(stmt)
+    ]
+
+
+def index_material(material):
+    """Add or refresh a material in the index; it must have been flushed"""
+    rows = _document_rows([material.id])
+    if rows:
+        _backend().index(rows)
+
+
+def remove_material(material_id):
+    _backend().remove(material_id)
+
+
+def rebuild_index(batch_size=1000):
+    """Reindex every material; returns how many were indexed"""
+    backend = _backend()
+    backend.clear()
+    rows = _document_rows()
+    for start in range(0, len(rows), batch_size):
+        backend.index(rows[start:start + batch_size])
+    return len(rows)
+
+
+def search_terms(query):
+    """Words of a user query, lower-cased; operators and punctuation are dropped"""
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def search_materials(query, limit=50):
+    """Materials matching every word of ``query``, best first, as (material, snippet) pairs.
+
+    Snippets are Markup with the matched words in <mark>.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    hits = _backend().search(terms, limit)
+    materials = {
+        material.id: material
+        for material in StudyMaterial.query.options(
+            joinedload(StudyMaterial.subject), joinedload(StudyMaterial.faculty))
+        .filter(StudyMaterial.id.in_([material_id for material_id, _ in hits]))
+    }
+    return [(materials[material_id], _highlight(snippet))
+            for material_id, snippet in hits if material_id in materials]
+
+
+def _highlight(snippet):
+    return Markup(str(escape(snippet or '')).replace(START, '<mark>').replace(STOP, '</mark>'))
@@ -0,0 +1,96 @@
+"""Content-addressable storage for uploaded files.
+
+A file is stored once under the SHA-256 of its content, in a two-level
+hashed layout (``ab/cd/abcd...``) below UPLOAD_FOLDER/blobs. Uploads are
+streamed to a temporary file while being hashed and then moved into place,
+so a path never holds partial or changing content and its URL can be cached
+forever. Which rows use a blob is counted by the Blob model.
+"""
+import hashlib
+import os
+import tempfile
+from flask import current_app
+
+BLOB_DIR = 'blobs'  # Under UPLOAD_FOLDER, so blobs are served like any other upload
+BLOCK_SIZE = 64 * 1024
+
+
+class LocalBlobStorage:
+    """Blobs in a directory on local disk"""
+
+    def __init__(self, upload_folder):
+        self.upload_folder = upload_folder
+        self.root = os.path.join(upload_folder, BLOB_DIR)
+
+    def relative_path(self, sha256):
+        """Path of a blob relative to UPLOAD_FOLDER"""
+        return '/'.join([BLOB_DIR, sha256[:2], sha256[2:4], sha256])
+
+    def path(self, sha256):
+        return os.path.join(self.upload_folder, self.relative_path(sha256))
+
+    def save(self, stream):
+        """Store the content of a binary stream and return its (sha256, size)"""
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(BLOCK_SIZE), b''):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            sha256 = digest.hexdigest()
+            path = self.path(sha256)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Always replace, even for a known blob, so the file is fresh for blobs-gc
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return sha256, size
+
+    def save_file(self, path):
+        """Move a complete file into storage and return its (sha256, size).
+
+        The file must be on the same filesystem as UPLOAD_FOLDER; it is read
+        once to hash it and then renamed, not copied.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                digest.update(block)
+                size += len(block)
+        sha256 = digest.hexdigest()
+        target = self.path(sha256)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return sha256, size
+
+    def exists(self, sha256):
+        return os.path.isfile(self.path(sha256))
+
+    def modified_at(self, sha256):
+        """Modification time of a blob as a timestamp, None if it is missing"""
+        try:
+            return os.path.getmtime(self.path(sha256))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, sha256):
+        try:
+            os.unlink(self.path(sha256))
+        except FileNotFoundError:
+            pass
+
+
+def init_app(app):
+    app.extensions['blob_storage'] = LocalBlobStorage(app.config['UPLOAD_FOLDER'])
+
+
+def get_storage():
+    return current_app.extensions['blob_storage']
@@ -0,0 +1,100 @@
+"""Per-request staging for uploaded files.
+
+Each upload is copied out of the request into its own spool: small files stay
+in memory, larger ones roll over to a private ``mkstemp`` file, so concurrent
+uploads never share a path. The staged copy outlives the request, which lets
+background jobs read it, and removes itself on ``cleanup()`` or when used as
+a context manager.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from flask import current_app
+
+BLOCK_SIZE = 64 * 1024
+
+
+class StagedUpload:
+    def __init__(self, filename, size, data=None, path=None, sha256=None):
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.path = path  # None while the upload is held in memory
+        self._data = data
+    
+    def __repr__(self):
+        return f'<StagedUpload {self.filename} {self.size} bytes>'
+    
+    @property
+    def in_memory(self):
+        return self.path is None
+    
+    def open(self):
+        """Return a new binary file object positioned at the start of the upload"""
+        if self.in_memory:
+            return io.BytesIO(self._data)
+        return open(self.path, 'rb')
+    
+    def cleanup(self):
+        self._data = None
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def stage_upload(file, hash_content=False):
+    """Copy a FileStorage into a StagedUpload, optionally computing its SHA-256.
+
+    Files up to UPLOAD_SPOOL_MAX_MEMORY bytes are kept in memory; anything
+    larger is streamed to a unique temp file in UPLOAD_STAGING_FOLDER.
+    """
+    max_memory = current_app.config['UPLOAD_SPOOL_MAX_MEMORY']
+    digest = hashlib.sha256() if hash_content else None
+    buffer = io.BytesIO()
+    spool = None
+    path = None
+    size = 0
+    
+    try:
+        for block in iter(lambda: file.stream.read(BLOCK_SIZE), b''):
+            size += len(block)
+            if digest:
+                digest.update(block)
+            if spool is None and size > max_memory:
+                path, spool = _open_spool_file(file.filename)
+                spool.write(buffer.getvalue())
+                buffer = None
+            (spool or buffer).write(block)
+    except Exception:
+        if spool:
+            spool.close()
+            os.remove(path)
+        raise
+    
+    if spool:
+        spool.close()
+    return StagedUpload(
+        filename=file.filename,
+        size=size,
+        data=buffer.getvalue() if buffer else None,
+        path=path,
+        sha256=digest.hexdigest() if digest else None,
+    )
+
+
+def _open_spool_file(filename):
+    folder = current_app.config['UPLOAD_STAGING_FOLDER']
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    suffix = os.path.splitext(filename or '')[1]
+    fd, path = tempfile.mkstemp(prefix='upload-', suffix=suffix, dir=folder)
+    return path, os.fdopen(fd, 'wb')
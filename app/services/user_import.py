@@ -0,0 +1,203 @@
+"""Bulk user provisioning from the admin CSV upload."""
+import csv
+import io
+import uuid
+import pandas as pd
+from datetime import datetime
+from ..extensions import db
+from ..models.user import User, Role, roles_users
+from ..models.department import Department
+from ..models.dashboard_stats import DashboardStats
+from .csv_stream import read_csv_chunks
+from .cache import invalidate
+from .jobs import save_artifact
+from .passwords import PasswordHasher, generate_password
+from .validation import EMAIL_PATTERN, validate_csv, reject_invalid, dry_run_summary
+
+USER_DTYPES = dict.fromkeys(['email', 'first_name', 'last_name', 'phone', 'department', 'roles'], str)
+USER_REQUIRED = ['email', 'first_name', 'last_name']
+USER_LENGTHS = {
+    'email': User.email,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'phone': User.phone,
+    'department': Department.name,
+}
+
+# Cache tags of the reference data the import may add to (see services/reference_data)
+REFERENCE_TAGS = {Department: 'subjects', Role: 'roles'}
+
+
+class UserImportContext:
+    """Lookups for one user import, so the row loop never touches the database.
+
+    Departments and roles are loaded once up front. For each chunk,
+    ``prepare`` fetches which of its emails already exist and creates any
+    departments and roles it names that are still missing, in one batch each.
+    Emails accepted earlier in the file are remembered to catch duplicates.
+    """
+
+    def __init__(self, default_role_names):
+        self.departments = dict(db.session.execute(db.select(Department.name, Department.id)).all())
+        self.roles = dict(db.session.execute(db.select(Role.name, Role.id)).all())
+        self.existing_emails = set()
+        self.seen_emails = set()
+        self._create_missing(Role, default_role_names, self.roles)
+        self.default_role_ids = [self.roles[name] for name in default_role_names]
+
+    def prepare(self, chunk):
+        emails = chunk['email'].dropna().unique().tolist()
+        self.existing_emails = set(db.session.scalars(
+            db.select(User.email).where(User.email.in_(emails)))) if emails else set()
+        if 'department' in chunk:
+            self._create_missing(Department, chunk['department'].dropna().unique(), self.departments)
+        if 'roles' in chunk:
+            names = {name for value in chunk['roles'].dropna() for name in _split_roles(value)}
+            self._create_missing(Role, names, self.roles)
+
+    @staticmethod
+    def _create_missing(model, names, ids):
+        missing = sorted(set(names) - ids.keys())
+        if missing:
+            db.session.execute(model.__table__.insert(), [{'name': name} for name in missing])
+            invalidate(REFERENCE_TAGS[model])  # Core inserts fire no mapper events
+            ids.update(db.session.execute(
+                db.select(model.name, model.id).where(model.name.in_(missing))).all())
+
+    def is_duplicate(self, email):
+        return email in self.existing_emails or email in self.seen_emails
+
+    def role_ids(self, roles):
+        """The default role ids followed by those named in a ``roles`` cell"""
+        role_ids = list(self.default_role_ids)
+        if pd.notna(roles):
+            for name in _split_roles(roles):
+                if self.roles[name] not in role_ids:
+                    role_ids.append(self.roles[name])
+        return role_ids
+
+
+def _split_roles(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def user_checks():
+    """The validation check for a user CSV; it remembers emails across chunks"""
+    seen_emails = set()
+
+    def check(chunk, report):
+        report.require(chunk, *USER_REQUIRED)
+        email = chunk['email']
+        report.flag(chunk, ~email.str.fullmatch(EMAIL_PATTERN, na=True), 'email',
+                    'Not a valid email address')
+        report.flag(chunk, email.notna() & (email.duplicated() | email.isin(seen_emails)), 'email',
+                    'Email appears more than once in the file')
+        seen_emails.update(email.dropna())
+        for column, model_column in USER_LENGTHS.items():
+            if column in chunk:
+                report.max_length(chunk, column, model_column.type.length)
+    return check
+
+
+def _insert_users(users, role_ids, hasher):
+    """Hash temporary passwords and insert users and their role links in bulk.
+
+    ``users`` are column dicts without a password and ``role_ids`` holds the
+    matching role id lists. Returns the (email, temporary password) pairs.
+    """
+    passwords = [generate_password() for _ in users]
+    for user, password_hash in zip(users, hasher.hash(passwords)):
+        user['password'] = password_hash
+    db.session.execute(User.__table__.insert(), users)
+    
+    emails = [user['email'] for user in users]
+    ids = dict(db.session.execute(db.select(User.email, User.id).where(User.email.in_(emails))).all())
+    links = [{'user_id': ids[email], 'role_id': role_id}
+             for email, user_role_ids in zip(emails, role_ids) for role_id in user_role_ids]
+    if links:
+        db.session.execute(roles_users.insert(), links)
+    return list(zip(emails, passwords))
+
+
+def import_users(job, upload, role_names, approved_by_id=None, dry_run=False):
+    """Job task: create the users listed in a staged CSV upload, then discard it.
+
+    ``role_names`` are assigned to every user in addition to any listed in an
+    optional ``roles`` column. Rows whose email already exists are skipped.
+    Every user gets their own temporary password; the list is saved as a
+    one-time download on the job and updated with each committed chunk, so it
+    covers the users created before a failure too. The file is validated first, and with
+    ``dry_run`` nothing else is done.
+    """
+    with upload, upload.open() as f, PasswordHasher() as hasher:
+        report = validate_csv(f, USER_DTYPES, USER_REQUIRED, user_checks())
+        reject_invalid(job, report)
+        if dry_run:
+            return dry_run_summary(report)
+        
+        job.update_progress(total_rows=report.rows)
+        context = UserImportContext(role_names)
+        credentials = []
+        error_count = 0
+        processed_rows = 0
+        
+        for chunk in read_csv_chunks(f, USER_DTYPES):
+            context.prepare(chunk)
+            errors = []
+            users = []
+            role_ids = []
+            now = datetime.utcnow()
+            for index, row in chunk.iterrows():
+                email = row['email']
+                if pd.isna(email):
+                    errors.append({'row': index + 2, 'error': 'Email is required'})
+                    continue
+                if context.is_duplicate(email):
+                    errors.append({'row': index + 2, 'error': f'User {email} already exists'})
+                    continue
+                
+                department = row.get('department')
+                phone = row.get('phone')  # Optional column
+                users.append({
+                    'email': email,
+                    'fs_uniquifier': uuid.uuid4().hex,
+                    'first_name': row['first_name'],
+                    'last_name': row['last_name'],
+                    'phone': phone if pd.notna(phone) else None,
+                    'department_id': context.departments[department] if pd.notna(department) else None,
+                    'active': True,
+                    'is_approved': True,
+                    'approval_date': now,
+                    'approved_by_id': approved_by_id,
+                    'created_at': now,
+                    'updated_at': now,
+                })
+                role_ids.append(context.role_ids(row.get('roles')))
+                context.seen_emails.add(email)
+            
+            if users:
+                credentials += _insert_users(users, role_ids, hasher)
+                DashboardStats.refresh('users')
+                # Saved with every chunk, so users committed before a failure can still log in
+                save_artifact(job, 'temporary-passwords.csv', _credentials_csv(credentials))
+            processed_rows += len(chunk)
+            error_count += len(errors)
+            job.update_progress(processed_rows=processed_rows, errors=errors)
+            db.session.commit()
+    
+    message = f'{len(credentials)} users created, {error_count} failed.'
+    if credentials:
+        message += ' Download the temporary passwords below; the file can only be downloaded once.'
+    return {
+        'created': len(credentials),
+        'failed': error_count,
+        'message': message,
+    }
+
+
+def _credentials_csv(credentials):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['email', 'temporary_password'])
+    writer.writerows(credentials)
+    return out.getvalue().encode()
@@ -0,0 +1,69 @@
+// Poll a background import job and render its progress
+(function() {
+    var POLL_INTERVAL = 1000;
+
+    function render(container, job) {
+        var bar = container.querySelector('.progress-bar');
+        var status = container.querySelector('.job-status');
+        var message = container.querySelector('.job-message');
+        var errors = container.querySelector('.job-errors');
+        var artifact = container.querySelector('.job-artifact');
+
+        var text = job.status.charAt(0).toUpperCase() + job.status.slice(1);
+        if (job.total_rows) {
+            var percent = Math.round(100 * job.processed_rows / job.total_rows);
+            bar.style.width = percent + '%';
+            text += ' - ' + job.processed_rows + ' / ' + job.total_rows + ' rows';
+        }
+        status.textContent = text;
+
+        if (job.finished) {
+            bar.classList.remove('active', 'progress-bar-striped');
+            bar.classList.add(job.status === 'succeeded' ? 'progress-bar-success' : 'progress-bar-danger');
+            bar.style.width = '100%';
+        }
+
+        var details = job.message || '';
+        if (job.duration !== null) {
+            details += (details ? ' ' : '') + '(' + job.duration.toFixed(1) + 's)';
+        }
+        message.textContent = details;
+
+        artifact.innerHTML = '';
+        if (job.artifact_url) {
+            var link = document.createElement('a');
+            link.href = job.artifact_url;
+            link.className = 'btn btn-default btn-sm';
+            link.textContent = 'Download ' + job.artifact;
+            link.addEventListener('click', function() {
+                // The file is removed once downloaded
+                setTimeout(function() { artifact.innerHTML = ''; }, 0);
+            });
+            artifact.appendChild(link);
+        }
+
+        errors.innerHTML = '';
+        job.errors.forEach(function(error) {
+            var item = document.createElement('li');
+            var where = error.row ? 'Row ' + error.row + (error.column ? ', ' + error.column : '') + ': ' : '';
+            item.textContent = where + error.error;
+            errors.appendChild(item);
+        });
+    }
+
+    function poll(container) {
+        fetch(container.dataset.jobUrl, {credentials: 'same-origin'})
+            .then(function(response) { return response.json(); })
+            .then(function(job) {
+                render(container, job);
+                if (!job.finished) {
+                    setTimeout(function() { poll(container); }, POLL_INTERVAL);
+                }
+            })
+            .catch(function(error) {
+                console.error('Error polling job:', error);
+            });
+    }
+
+    document.querySelectorAll('.job-progress').forEach(poll);
+})();
@@ -0,0 +1,159 @@
+// Fill the admin list tabs page by page from the JSON list endpoints
+(function() {
+    var csrfToken = document.querySelector('meta[name="csrf-token"]').content;
+
+    function cell(text) {
+        var td = document.createElement('td');
+        td.textContent = text === null || text === undefined ? '' : text;
+        return td;
+    }
+
+    function statusCell(item) {
+        var td = document.createElement('td');
+        var label = document.createElement('span');
+        label.className = 'label ' + (item.is_approved ? 'label-success' : 'label-warning');
+        label.textContent = item.is_approved ? 'Approved' : 'Pending';
+        td.appendChild(label);
+        return td;
+    }
+
+    function postButton(url, className, content, confirmText) {
+        var form = document.createElement('form');
+        form.method = 'POST';
+        form.action = url;
+        form.style.display = 'inline';
+        if (confirmText) {
+            form.onsubmit = function() { return confirm(confirmText); };
+        }
+        var token = document.createElement('input');
+        token.type = 'hidden';
+        token.name = 'csrf_token';
+        token.value = csrfToken;
+        var button = document.createElement('button');
+        button.type = 'submit';
+        button.className = className;
+        button.innerHTML = content;
+        form.appendChild(token);
+        form.appendChild(button);
+        return form;
+    }
+
+    function approvalActions(item) {
+        var td = document.createElement('td');
+        if (!item.is_approved) {
+            td.appendChild(postButton(item.urls.approve, 'btn btn-success btn-sm', '<i class="fas fa-check"></i>'));
+            td.appendChild(document.createTextNode(' '));
+            td.appendChild(postButton(item.urls.reject, 'btn btn-danger btn-sm', '<i class="fas fa-times"></i>'));
+        }
+        return td;
+    }
+
+    function row(cells) {
+        var tr = document.createElement('tr');
+        cells.forEach(function(td) { tr.appendChild(td); });
+        return tr;
+    }
+
+    function date(value) {
+        return value ? value.slice(0, 10) : '';
+    }
+
+    // One renderer per data-row kind, matching the tab's table header
+    var RENDERERS = {
+        user: function(item) {
+            return row([cell(item.id), cell(item.name), cell(item.email), cell(item.department),
+                        cell(item.phone), statusCell(item), cell(date(item.created_at)), approvalActions(item)]);
+        },
+        staff: function(item) {
+            return row([cell(item.id), cell(item.name), cell(item.email), cell(item.phone),
+                        statusCell(item), cell(date(item.created_at)), approvalActions(item)]);
+        },
+        hod: function(item) {
+            var actions = document.createElement('td');
+            var edit = document.createElement('a');
+            edit.href = item.urls.edit;
+            edit.className = 'btn btn-sm btn-primary';
+            edit.textContent = 'Edit';
+            actions.appendChild(edit);
+            actions.appendChild(document.createTextNode(' '));
+            actions.appendChild(postButton(item.urls.delete, 'btn btn-sm btn-danger', 'Delete',
+                                           'Are you sure you want to delete this HOD?'));
+            return row([cell(item.id), cell(item.name), cell(item.email), cell(item.phone),
+                        cell(item.department || 'Not Assigned'), actions]);
+        },
+        project: function(item) {
+            var actions = document.createElement('td');
+            var edit = document.createElement('button');
+            edit.type = 'button';
+            edit.className = 'btn btn-sm btn-primary';
+            edit.innerHTML = '<i class="fas fa-edit"></i> Edit';
+            edit.onclick = function() { editProject(item.id); };
+            actions.appendChild(edit);
+            actions.appendChild(document.createTextNode(' '));
+            actions.appendChild(postButton(item.urls.delete, 'btn btn-sm btn-danger', '<i class="fas fa-trash"></i> Delete',
+                                           'Are you sure you want to delete this project?'));
+            return row([cell(item.name), cell(item.description), cell(item.department || 'N/A'),
+                        cell(item.group_leader), cell(item.members), cell(item.marks), actions]);
+        }
+    };
+
+    function load(list, reset) {
+        var params = new URLSearchParams();
+        new FormData(list.querySelector('.lazy-filter')).forEach(function(value, key) {
+            if (value) {
+                params.set(key, value);
+            }
+        });
+        if (!reset && list.dataset.cursor) {
+            params.set('cursor', list.dataset.cursor);
+        }
+        var source = list.dataset.source;
+        var url = source + (source.indexOf('?') === -1 ? '?' : '&') + params.toString();
+        var more = list.querySelector('.lazy-more');
+        more.disabled = true;
+
+        fetch(url, {credentials: 'same-origin'})
+            .then(function(response) { return response.json(); })
+            .then(function(page) {
+                var tbody = list.querySelector('tbody');
+                if (reset) {
+                    tbody.innerHTML = '';
+                }
+                page.items.forEach(function(item) {
+                    tbody.appendChild(RENDERERS[list.dataset.row](item));
+                });
+                list.dataset.cursor = page.next_cursor || '';
+                list.querySelector('.lazy-empty').style.display = tbody.children.length ? 'none' : '';
+                more.style.display = page.next_cursor ? '' : 'none';
+                more.disabled = false;
+            })
+            .catch(function(error) {
+                console.error('Error loading list:', error);
+                more.disabled = false;
+            });
+    }
+
+    function init(list) {
+        if (list.dataset.loaded) {
+            return;
+        }
+        list.dataset.loaded = 'true';
+        list.querySelector('.lazy-filter').addEventListener('submit', function(e) {
+            e.preventDefault();
+            load(list, true);
+        });
+        list.querySelector('.lazy-more').addEventListener('click', function() {
+            load(list, false);
+        });
+        load(list, true);
+    }
+
+    // A tab's first page is only fetched when the tab is first shown
+    $(document).on('shown.bs.tab', 'a[data-toggle="tab"]', function(e) {
+        var pane = document.querySelector(e.target.getAttribute('href'));
+        if (pane) {
+            pane.querySelectorAll('.lazy-list').forEach(init);
+        }
+    });
+    document.querySelectorAll('.tab-pane.active .lazy-list').forEach(init);
+})();
@@ -0,0 +1,137 @@
+// Upload a study material in resumable chunks instead of one multipart POST
+(function() {
+    var MAX_RETRIES = 5;
+
+    var form = document.querySelector('form[data-chunked-upload]');
+    if (!form || !window.fetch || !window.localStorage || !Blob.prototype.slice) {
+        return;  // The form posts the whole file as before
+    }
+    var uploadsUrl = form.getAttribute('data-chunked-upload');
+    var csrfToken = document.querySelector('meta[name="csrf-token"]').content;
+    var fileInput = form.querySelector('input[type="file"]');
+    var progress = document.getElementById('upload-progress');
+    var bar = progress.querySelector('.progress-bar');
+    var status = document.getElementById('upload-status');
+    var submit = form.querySelector('[type="submit"]');
+
+    function request(method, url, body, headers) {
+        headers = headers || {};
+        headers['X-CSRFToken'] = csrfToken;
+        return fetch(url, {method: method, body: body, headers: headers, credentials: 'same-origin'})
+            .then(function(response) {
+                return response.json().catch(function() { return {}; }).then(function(data) {
+                    if (!response.ok) {
+                        var error = new Error(data.error || response.statusText);
+                        error.status = response.status;
+                        error.data = data;
+                        throw error;
+                    }
+                    return data;
+                });
+            });
+    }
+
+    function sha256(blob) {
+        if (!(window.crypto && crypto.subtle && blob.arrayBuffer)) {
+            return Promise.resolve(null);  // Only available on HTTPS; the server then checks lengths only
+        }
+        return blob.arrayBuffer()
+            .then(function(buffer) { return crypto.subtle.digest('SHA-256', buffer); })
+            .then(function(hash) {
+                return Array.prototype.map.call(new Uint8Array(hash), function(b) {
+                    return ('0' + b.toString(16)).slice(-2);
+                }).join('');
+            });
+    }
+
+    function storageKey(file) {
+        return 'chunked-upload:' + [file.name, file.size, file.lastModified].join(':');
+    }
+
+    function openSession(file) {
+        function start() {
+            return request('POST', uploadsUrl, JSON.stringify({filename: file.name, size: file.size}),
+                           {'Content-Type': 'application/json'})
+                .then(function(upload) {
+                    localStorage.setItem(storageKey(file), upload.id);
+                    return upload;
+                });
+        }
+        // Resume an interrupted upload of the same file, or start over if it expired
+        var saved = localStorage.getItem(storageKey(file));
+        return saved ? request('GET', uploadsUrl + '/' + saved).catch(start) : start();
+    }
+
+    function sendChunk(upload, file, index, attempt) {
+        var chunk = file.slice(index * upload.chunk_size, Math.min(file.size, (index + 1) * upload.chunk_size));
+        return sha256(chunk).then(function(digest) {
+            var headers = {'Content-Type': 'application/octet-stream'};
+            if (digest) {
+                headers['X-Chunk-SHA256'] = digest;
+            }
+            return request('PUT', uploadsUrl + '/' + upload.id + '/chunks/' + index, chunk, headers);
+        }).catch(function(error) {
+            // Network errors, server errors and corrupted chunks are retried with backoff
+            var retry = !error.status || error.status >= 500 || error.status === 422;
+            if (!retry || attempt >= MAX_RETRIES) {
+                throw error;
+            }
+            status.textContent = 'Connection lost, retrying...';
+            return new Promise(function(resolve) { setTimeout(resolve, 1000 * Math.pow(2, attempt)); })
+                .then(function() { return sendChunk(upload, file, index, attempt + 1); });
+        });
+    }
+
+    function showProgress(done, total) {
+        var percent = Math.round(100 * done / total);
+        bar.style.width = percent + '%';
+        status.textContent = 'Uploading... ' + percent + '%';
+    }
+
+    function upload(file) {
+        return openSession(file).then(function(session) {
+            var received = {};
+            session.received.forEach(function(index) { received[index] = true; });
+            var done = session.received.length;
+            showProgress(done, session.chunk_count);
+
+            // Chunks are sent one at a time so a slow link is not flooded
+            var chain = Promise.resolve();
+            for (var i = 0; i < session.chunk_count; i++) {
+                if (received[i]) {
+                    continue;
+                }
+                chain = chain.then(sendChunk.bind(null, session, file, i, 0)).then(function() {
+                    showProgress(++done, session.chunk_count);
+                });
+            }
+            return chain.then(function() {
+                var data = new FormData(form);
+                data.delete(fileInput.name);
+                status.textContent = 'Saving...';
+                return request('POST', uploadsUrl + '/' + session.id + '/complete', data);
+            });
+        });
+    }
+
+    form.addEventListener('submit', function(event) {
+        var file = fileInput.files[0];
+        if (!file) {
+            return;
+        }
+        event.preventDefault();
+        submit.disabled = true;
+        progress.style.display = '';
+        upload(file).then(function(result) {
+            localStorage.removeItem(storageKey(file));
+            window.location = result.redirect;
+        }).catch(function(error) {
+            var messages = [];
+            var errors = (error.data && error.data.errors) || {};
+            Object.keys(errors).forEach(function(field) { messages = messages.concat(errors[field]); });
+            status.textContent = (error.message || 'Upload failed') + (messages.length ? ': ' + messages.join(' ') : '') +
+                '. Submit again to resume.';
+            submit.disabled = false;
+        });
+    });
+})();
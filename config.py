@@ -47,3 +47,44 @@ class Config:
     # Upload configuration
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+
+    # Study materials are uploaded in chunks of UPLOAD_CHUNK_SIZE (each request stays under
+    # MAX_CONTENT_LENGTH) up to MATERIAL_MAX_SIZE; unfinished uploads expire after CHUNKED_UPLOAD_EXPIRY
+    MATERIAL_MAX_SIZE = int(os.getenv('MATERIAL_MAX_SIZE', 200 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+    CHUNKED_UPLOAD_EXPIRY = int(os.getenv('CHUNKED_UPLOAD_EXPIRY', 24 * 3600))  # seconds
+
+    # How study material downloads are sent: 'send_file' streams from Python (development),
+    # 'x-accel' lets nginx send the file from the internal location below
+    MATERIAL_DELIVERY = os.getenv('MATERIAL_DELIVERY', 'send_file')
+    X_ACCEL_UPLOADS_LOCATION = os.getenv('X_ACCEL_UPLOADS_LOCATION', '/uploads')  # Aliased to UPLOAD_FOLDER
+
+    # Uploads up to this size are staged in memory, larger ones in a private temp file
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', 1024 * 1024))
+    UPLOAD_STAGING_FOLDER = os.getenv('UPLOAD_STAGING_FOLDER')  # None uses the system temp dir
+
+    # Import configuration
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 1000))  # CSV rows read and committed at a time
+    RESULT_UPSERT_BATCH_SIZE = int(os.getenv('RESULT_UPSERT_BATCH_SIZE', 500))
+
+    # Background jobs (uploads are processed off the request thread)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_ARTIFACT_FOLDER = os.getenv('JOB_ARTIFACT_FOLDER')  # None uses UPLOAD_FOLDER/job_artifacts
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))  # 0 uses one process per CPU
+
+    # Admin lists (users and projects are fetched page by page as JSON)
+    ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', 50))
+    ADMIN_MAX_PAGE_SIZE = 200
+    MATERIALS_PAGE_SIZE = int(os.getenv('MATERIALS_PAGE_SIZE', 24))
+
+    # Dashboard figures are precomputed on writes; this bounds drift from writes made elsewhere
+    DASHBOARD_STATS_MAX_AGE = int(os.getenv('DASHBOARD_STATS_MAX_AGE', 600))  # seconds
+
+    # Cache for read-mostly pages: 'memory' (per process), 'filesystem' (shared per host) or 'null'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'memory')
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))  # seconds
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1000))
+    CACHE_DIR = os.getenv('CACHE_DIR')  # None uses the instance folder
+
+    # Seconds between checks whether departments, roles or subjects changed in another process
+    REFERENCE_DATA_CHECK_INTERVAL = int(os.getenv('REFERENCE_DATA_CHECK_INTERVAL', 10))
@@ -1,18 +1,38 @@
 from app import create_app
 from app.extensions import db
-from app.models.project import Project
+from app.services.project_import import import_project_csv, check_project_rows, FORM_DTYPES
+from app.services.validation import validate_csv
+from app.services.import_ledger import hash_file
+from app.models.import_ledger import ImportedFile
+import os
 
 app = create_app()
 
-def import_projects_from_form(csv_file):
-    """Import projects from Google Form responses CSV file"""
-    with app.app_context():
+def import_projects_from_form(csv_file, force=False):
+    """Import projects from Google Form responses CSV file.
+
+    Responses imported before update their project instead of adding a
+    duplicate; unchanged ones, or the whole file if it was the last one
+    imported, are skipped unless ``force`` is set.
+    """
+    with app.app_context(), open(csv_file, 'rb') as f:
+        sha256 = hash_file(f)
+        if not force and ImportedFile.is_current('projects', sha256):
+            print("This file was already imported; nothing has changed")
+            return True
+        report = validate_csv(f, FORM_DTYPES, list(FORM_DTYPES), check_project_rows)
+        if not report.is_valid:
+            print(f"Nothing imported: {len(report.errors)} errors in {report.bad_rows} rows")
+            for error in report.sorted_errors()[:20]:
+                print(f"  Row {error['row']}, {error['column']}: {error['error']} ({error['value']!r})")
+            return False
+        
         try:
-            projects = Project.import_from_csv(csv_file)
-            for project in projects:
-                db.session.add(project)
+            counts = import_project_csv(f, skip_unchanged=not force)
+            ImportedFile.record('projects', sha256, os.path.basename(csv_file), report.rows)
             db.session.commit()
-            print(f"Successfully imported {len(projects)} projects!")
+            print(f"Successfully imported projects: {counts['inserted']} new, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged")
             return True
         except Exception as e:
             print(f"Error importing projects: {str(e)}")
@@ -22,9 +42,10 @@ def import_projects_from_form(csv_file):
 if __name__ == '__main__':
     import sys
     
-    if len(sys.argv) != 2:
-        print("Usage: python import_project_fair.py <path_to_responses.csv>")
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    if len(args) != 1:
+        print("Usage: python import_project_fair.py [--force] <path_to_responses.csv>")
         sys.exit(1)
     
-    csv_file = sys.argv[1]
-    import_projects_from_form(csv_file)
+    csv_file = args[0]
+    import_projects_from_form(csv_file, force='--force' in sys.argv)
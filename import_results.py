@@ -0,0 +1,65 @@
+from app import create_app
+from app.extensions import db
+from app.services.result_import import import_result_csv, check_result_rows, RESULT_DTYPES, RESULT_REQUIRED
+from app.services.validation import validate_csv
+from app.services.import_ledger import hash_file
+from app.models.import_ledger import ImportedFile
+import argparse
+import os
+
+app = create_app()
+
+def import_results_from_csv(csv_file, chunk_size=None, batch_size=None, dry_run=False, errors_file=None,
+                            force=False):
+    """Validate a GTU result CSV file, then import it into the results table one chunk of rows at a time.
+
+    Rows imported before, or the whole file if it was the last one imported,
+    are skipped unless ``force`` is set.
+    """
+    with app.app_context(), open(csv_file, 'rb') as f:
+        sha256 = hash_file(f)
+        if not (dry_run or force) and ImportedFile.is_current('results', sha256):
+            print("This file was already imported; nothing has changed")
+            return True
+        report = validate_csv(f, RESULT_DTYPES, RESULT_REQUIRED, check_result_rows, chunk_size)
+        if not report.is_valid:
+            print(f"Nothing imported: {len(report.errors)} errors in {report.bad_rows} rows")
+            if errors_file:
+                with open(errors_file, 'wb') as out:
+                    out.write(report.to_csv())
+                print(f"Error report written to {errors_file}")
+            else:
+                for error in report.sorted_errors()[:20]:
+                    print(f"  Row {error['row']}, {error['column']}: {error['error']} ({error['value']!r})")
+            return False
+        if dry_run:
+            print(f"Dry run: all {report.rows} rows are valid")
+            return True
+        
+        try:
+            summary = import_result_csv(f, chunksize=chunk_size, batch_size=batch_size,
+                                        on_chunk=lambda rows: print(f"Processed {rows} rows..."),
+                                        skip_unchanged=not force)
+            ImportedFile.record('results', sha256, os.path.basename(csv_file), report.rows)
+            db.session.commit()
+            print(f"Imported results: {summary['inserted']} new, {summary['updated']} updated, "
+                  f"{summary['unchanged']} unchanged, {summary['skipped']} skipped")
+            return True
+        except Exception as e:
+            print(f"Error importing results: {str(e)}")
+            db.session.rollback()
+            return False
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import a GTU result CSV file')
+    parser.add_argument('csv_file', help='Path to the GTU result CSV export')
+    parser.add_argument('--chunk-size', type=int, help='CSV rows read and committed at a time')
+    parser.add_argument('--batch-size', type=int, help='Rows per upsert batch')
+    parser.add_argument('--dry-run', action='store_true', help='Only validate the file')
+    parser.add_argument('--errors', metavar='PATH', help='Write the per-row error report to this CSV file')
+    parser.add_argument('--force', action='store_true', help='Re-import rows even if this file was imported before')
+    
+    args = parser.parse_args()
+    ok = import_results_from_csv(args.csv_file, args.chunk_size, args.batch_size, args.dry_run, args.errors,
+                                 args.force)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,63 @@
+"""Add import ledger tables
+
+Revision ID: 2c7f9a1d4e83
+Revises: 1b4e8c2f6d90
+Create Date: 2026-10-18 16:05:41.270114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7f9a1d4e83'
+down_revision = '1b4e8c2f6d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('imported_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('row_count', sa.Integer(), nullable=True),
+    sa.Column('imported_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'sha256', name='uq_imported_files_kind_sha256')
+    )
+    imported_rows = op.create_table('imported_rows',
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('row_hash', sa.BigInteger(), nullable=True),
+    sa.Column('record_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('kind', 'key')
+    )
+
+    # Adopt the projects imported before the ledger existed, so the next
+    # import of their responses updates them instead of adding duplicates.
+    # Without a stored hash each of them is rewritten once.
+    projects = sa.table('projects',
+                        sa.column('id', sa.Integer),
+                        sa.column('name', sa.String),
+                        sa.column('submission_timestamp', sa.DateTime))
+    rows = op.get_bind().execute(
+        sa.select(projects.c.id, projects.c.name, projects.c.submission_timestamp)
+        .where(projects.c.submission_timestamp.isnot(None))
+        .order_by(projects.c.id))
+    ledger = {}
+    for project_id, name, submitted in rows:
+        key = f"{submitted.strftime('%Y-%m-%dT%H:%M:%S')}|{name.strip()}"
+        ledger[key[:255]] = project_id  # The newest duplicate wins
+    if ledger:
+        op.bulk_insert(imported_rows, [
+            {'kind': 'projects', 'key': key, 'row_hash': None, 'record_id': project_id}
+            for key, project_id in ledger.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('imported_rows')
+    op.drop_table('imported_files')
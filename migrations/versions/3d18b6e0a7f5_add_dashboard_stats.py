@@ -0,0 +1,35 @@
+"""Add dashboard_stats table
+
+Revision ID: 3d18b6e0a7f5
+Revises: 2c7f9a1d4e83
+Create Date: 2026-10-18 16:48:12.553907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d18b6e0a7f5'
+down_revision = '2c7f9a1d4e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The row itself is computed on the first dashboard visit
+    op.create_table('dashboard_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('students', sa.Integer(), nullable=False),
+    sa.Column('lecturers', sa.Integer(), nullable=False),
+    sa.Column('departments', sa.Integer(), nullable=False),
+    sa.Column('pending_approvals', sa.Integer(), nullable=False),
+    sa.Column('total_results', sa.Integer(), nullable=False),
+    sa.Column('recent_results', sa.JSON(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_stats')
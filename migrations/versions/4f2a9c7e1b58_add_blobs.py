@@ -0,0 +1,55 @@
+"""Add blobs table for content-addressed uploads
+
+Revision ID: 4f2a9c7e1b58
+Revises: 3d18b6e0a7f5
+Create Date: 2026-10-18 18:02:37.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c7e1b58'
+down_revision = '3d18b6e0a7f5'
+branch_labels = None
+depends_on = None
+
+
+def _has_study_materials():
+    # study_materials has no migration of its own and is created by init_db
+    return 'study_materials' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_blobs_ref_count'), ['ref_count'], unique=False)
+
+    if _has_study_materials():
+        with op.batch_alter_table('study_materials', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+            batch_op.add_column(sa.Column('original_filename', sa.String(length=255), nullable=True))
+            batch_op.create_index(batch_op.f('ix_study_materials_blob_sha256'), ['blob_sha256'], unique=False)
+            batch_op.create_foreign_key('fk_study_materials_blob_sha256', 'blobs', ['blob_sha256'], ['sha256'])
+
+
+def downgrade():
+    if _has_study_materials():
+        with op.batch_alter_table('study_materials', schema=None) as batch_op:
+            batch_op.drop_constraint('fk_study_materials_blob_sha256', type_='foreignkey')
+            batch_op.drop_index(batch_op.f('ix_study_materials_blob_sha256'))
+            batch_op.drop_column('original_filename')
+            batch_op.drop_column('blob_sha256')
+
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blobs_ref_count'))
+
+    op.drop_table('blobs')
@@ -0,0 +1,64 @@
+"""Add full-text search index over study materials
+
+Revision ID: 5a6c2e8d1f47
+Revises: 4f2a9c7e1b58
+Create Date: 2026-10-18 18:41:09.530261
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a6c2e8d1f47'
+down_revision = '4f2a9c7e1b58'
+branch_labels = None
+depends_on = None
+
+# The same statements run on db.create_all, see app/services/search.py
+CREATE = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS study_materials_fts USING fts5("
+        "title, description, subject, faculty, tokenize='porter unicode61')",
+        "INSERT INTO study_materials_fts (rowid, title, description, subject, faculty) "
+        "SELECT m.id, m.title, coalesce(m.description, ''), trim(coalesce(s.code, '') || ' ' || coalesce(s.name, '')), "
+        "coalesce(nullif(u.name, ''), trim(coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, ''))) "
+        "FROM study_materials m "
+        "LEFT JOIN subject s ON s.id = m.subject_id LEFT JOIN \"user\" u ON u.id = m.faculty_id",
+    ],
+    'postgresql': [
+        'CREATE TABLE IF NOT EXISTS study_materials_search ('
+        'material_id INTEGER PRIMARY KEY REFERENCES study_materials (id) ON DELETE CASCADE, '
+        'content TEXT NOT NULL, document TSVECTOR NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_study_materials_search_document '
+        'ON study_materials_search USING gin (document)',
+        "INSERT INTO study_materials_search (material_id, content, document) "
+        "SELECT m.id, concat_ws(' ', m.title, s.code, s.name, m.description, "
+        "coalesce(nullif(u.name, ''), concat_ws(' ', u.first_name, u.last_name))), "
+        "setweight(to_tsvector('english', m.title), 'A') || "
+        "setweight(to_tsvector('english', concat_ws(' ', s.code, s.name)), 'B') || "
+        "setweight(to_tsvector('english', coalesce(nullif(u.name, ''), concat_ws(' ', u.first_name, u.last_name), '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(m.description, '')), 'D') "
+        'FROM study_materials m LEFT JOIN subject s ON s.id = m.subject_id '
+        'LEFT JOIN "user" u ON u.id = m.faculty_id',
+    ],
+}
+DROP = {
+    'sqlite': ['DROP TABLE IF EXISTS study_materials_fts'],
+    'postgresql': ['DROP TABLE IF EXISTS study_materials_search'],
+}
+
+
+def upgrade():
+    # study_materials has no migration of its own; when init_db creates it later,
+    # the index table is created with it
+    conn = op.get_bind()
+    if 'study_materials' not in sa.inspect(conn).get_table_names():
+        return
+    for statement in CREATE.get(conn.dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in DROP.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
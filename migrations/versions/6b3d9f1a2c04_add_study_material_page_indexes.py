@@ -0,0 +1,35 @@
+"""Add keyset pagination indexes on study_materials
+
+Revision ID: 6b3d9f1a2c04
+Revises: 5a6c2e8d1f47
+Create Date: 2026-10-18 19:20:44.802117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b3d9f1a2c04'
+down_revision = '5a6c2e8d1f47'
+branch_labels = None
+depends_on = None
+
+
+def _has_study_materials():
+    # study_materials has no migration of its own and is created by init_db
+    return 'study_materials' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _has_study_materials():
+        with op.batch_alter_table('study_materials', schema=None) as batch_op:
+            batch_op.create_index('ix_study_materials_upload_date_id', ['upload_date', 'id'], unique=False)
+            batch_op.create_index('ix_study_materials_subject_upload_date_id', ['subject_id', 'upload_date', 'id'], unique=False)
+
+
+def downgrade():
+    if _has_study_materials():
+        with op.batch_alter_table('study_materials', schema=None) as batch_op:
+            batch_op.drop_index('ix_study_materials_subject_upload_date_id')
+            batch_op.drop_index('ix_study_materials_upload_date_id')
@@ -0,0 +1,34 @@
+"""Add unique constraint on results (student_id, exam_id)
+
+Revision ID: b7d2c41e9a13
+Revises: 4ba612126b91
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2c41e9a13'
+down_revision = '4ba612126b91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the newest row for any (student_id, exam_id) uploaded more than once.
+    # Rows missing either key never conflict under the constraint and are left alone.
+    op.execute(
+        'DELETE FROM results '
+        'WHERE student_id IS NOT NULL AND exam_id IS NOT NULL AND id NOT IN '
+        '(SELECT MAX(id) FROM results '
+        'WHERE student_id IS NOT NULL AND exam_id IS NOT NULL '
+        'GROUP BY student_id, exam_id)'
+    )
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_results_student_exam', ['student_id', 'exam_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_results_student_exam', type_='unique')
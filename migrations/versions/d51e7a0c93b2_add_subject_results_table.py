@@ -0,0 +1,115 @@
+"""Move per-subject results from results.subject_results JSON into a subject_results table
+
+Revision ID: d51e7a0c93b2
+Revises: c3a8f0d2e514
+Create Date: 2026-10-18 12:26:51.730415
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd51e7a0c93b2'
+down_revision = 'c3a8f0d2e514'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.services.result_import.GRADE_POINTS
+GRADE_POINTS = {
+    'AA': 10, 'AB': 9, 'BB': 8, 'BC': 7, 'CC': 6, 'CD': 5, 'DD': 4, 'FF': 0
+}
+
+subject_results = sa.table(
+    'subject_results',
+    sa.column('result_id', sa.Integer),
+    sa.column('slot', sa.Integer),
+    sa.column('subject_code', sa.String),
+    sa.column('subject_name', sa.String),
+    sa.column('credits', sa.Float),
+    sa.column('grade', sa.String),
+    sa.column('grade_points', sa.Float),
+)
+
+
+def _load(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or {}
+
+
+def upgrade():
+    op.create_table('subject_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('result_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=True),
+    sa.Column('subject_code', sa.String(length=20), nullable=False),
+    sa.Column('subject_name', sa.String(length=200), nullable=True),
+    sa.Column('credits', sa.Float(), nullable=True),
+    sa.Column('grade', sa.String(length=5), nullable=True),
+    sa.Column('grade_points', sa.Float(), nullable=True),
+    sa.Column('theory_grade', sa.String(length=5), nullable=True),
+    sa.Column('theory_ese_grade', sa.String(length=5), nullable=True),
+    sa.Column('theory_pa_grade', sa.String(length=5), nullable=True),
+    sa.Column('practical_grade', sa.String(length=5), nullable=True),
+    sa.Column('practical_ese_grade', sa.String(length=5), nullable=True),
+    sa.Column('practical_pa_grade', sa.String(length=5), nullable=True),
+    sa.ForeignKeyConstraint(['result_id'], ['results.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('subject_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_subject_results_result_id'), ['result_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_subject_results_grade'), ['grade'], unique=False)
+        batch_op.create_index('ix_subject_results_code_grade', ['subject_code', 'grade'], unique=False)
+
+    # Backfill from the JSON blobs, which hold {'SUBn': {code, name, credits, grade}}
+    conn = op.get_bind()
+    rows = []
+    for result_id, blob in conn.execute(sa.text(
+            'SELECT id, subject_results FROM results WHERE subject_results IS NOT NULL')):
+        for key, subject in _load(blob).items():
+            if not subject.get('code'):
+                continue
+            rows.append({
+                'result_id': result_id,
+                'slot': int(key[3:]) if key[3:].isdigit() else None,
+                'subject_code': subject['code'],
+                'subject_name': subject.get('name'),
+                'credits': float(subject.get('credits') or 0),
+                'grade': subject.get('grade'),
+                'grade_points': float(GRADE_POINTS.get(subject.get('grade'), 0)),
+            })
+        if len(rows) >= 1000:
+            op.bulk_insert(subject_results, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(subject_results, rows)
+
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.drop_column('subject_results')
+
+
+def downgrade():
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subject_results', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    blobs = {}
+    for result_id, slot, code, name, credits, grade in conn.execute(sa.text(
+            'SELECT result_id, slot, subject_code, subject_name, credits, grade '
+            'FROM subject_results ORDER BY result_id, slot')):
+        blobs.setdefault(result_id, {})[f'SUB{slot}'] = {
+            'code': code, 'name': name, 'credits': credits, 'grade': grade,
+        }
+    results = sa.table('results', sa.column('id', sa.Integer), sa.column('subject_results', sa.JSON))
+    for result_id, blob in blobs.items():
+        conn.execute(results.update().where(results.c.id == result_id).values(subject_results=blob))
+
+    with op.batch_alter_table('subject_results', schema=None) as batch_op:
+        batch_op.drop_index('ix_subject_results_code_grade')
+        batch_op.drop_index(batch_op.f('ix_subject_results_grade'))
+        batch_op.drop_index(batch_op.f('ix_subject_results_result_id'))
+
+    op.drop_table('subject_results')
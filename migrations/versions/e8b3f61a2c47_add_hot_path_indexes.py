@@ -0,0 +1,55 @@
+"""Add composite indexes for the results and users hot paths
+
+Revision ID: e8b3f61a2c47
+Revises: d51e7a0c93b2
+Create Date: 2026-10-18 13:05:12.559107
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f61a2c47'
+down_revision = 'd51e7a0c93b2'
+branch_labels = None
+depends_on = None
+
+
+def _has_student_id_index():
+    # Databases built by init_db have the old single-column index from Result.student_id
+    return 'ix_results_student_id' in {
+        index['name'] for index in sa.inspect(op.get_bind()).get_indexes('results')}
+
+
+def upgrade():
+    # ix_results_student_date leads with student_id and covers the same lookups
+    drop_student_id = _has_student_id_index()
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        if drop_student_id:
+            batch_op.drop_index('ix_results_student_id')
+        batch_op.create_index('ix_results_student_date', ['student_id', 'declaration_date'], unique=False)
+        batch_op.create_index('ix_results_filters', ['branch_code', 'exam_type', 'semester', 'declaration_date'], unique=False)
+        batch_op.create_index('ix_results_declaration_date', ['declaration_date'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_is_approved'), ['is_approved'], unique=False)
+
+    with op.batch_alter_table('roles_users', schema=None) as batch_op:
+        batch_op.create_index('ix_roles_users_user_role', ['user_id', 'role_id'], unique=False)
+        batch_op.create_index('ix_roles_users_role_user', ['role_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('roles_users', schema=None) as batch_op:
+        batch_op.drop_index('ix_roles_users_role_user')
+        batch_op.drop_index('ix_roles_users_user_role')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_is_approved'))
+
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.drop_index('ix_results_declaration_date')
+        batch_op.drop_index('ix_results_filters')
+        batch_op.drop_index('ix_results_student_date')
+        batch_op.create_index('ix_results_student_id', ['student_id'], unique=False)
@@ -0,0 +1,40 @@
+"""Add (created_at, id) indexes for keyset pagination of users and projects
+
+Revision ID: f2c9d4e7b136
+Revises: e8b3f61a2c47
+Create Date: 2026-10-18 14:10:38.204571
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9d4e7b136'
+down_revision = 'e8b3f61a2c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows without created_at would never appear in a keyset page
+    op.execute('UPDATE "user" SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL')
+    op.execute('UPDATE projects SET created_at = COALESCE(submission_timestamp, CURRENT_TIMESTAMP) '
+               'WHERE created_at IS NULL')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_user_department_created_at_id', ['department_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_projects_department_created_at_id', ['department_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_department_created_at_id')
+        batch_op.drop_index('ix_projects_created_at_id')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_department_created_at_id')
+        batch_op.drop_index('ix_user_created_at_id')
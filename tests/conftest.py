@@ -0,0 +1,53 @@
+import time
+import uuid
+import pytest
+from app import create_app
+from app.extensions import db
+from app.models.job import Job
+from app.models.user import User, Role
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        WTF_CSRF_ENABLED = False
+        SESSION_PROTECTION = None  # Sessions are written directly by the tests
+        SECURITY_PASSWORD_HASH = 'bcrypt'  # The scheme in requirements.txt
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        PASSWORD_HASH_WORKERS = 1
+        CACHE_TYPE = 'null'
+        REFERENCE_DATA_CHECK_INTERVAL = 0
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin_client(app):
+    admin = User(email='admin@gppalanpur.in', fs_uniquifier=uuid.uuid4().hex, active=True,
+                 is_approved=True, roles=[Role(name='admin')])
+    db.session.add(admin)
+    db.session.commit()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin.fs_uniquifier
+        session['_fresh'] = True
+    return client
+
+
+def wait_for_job(job_id, timeout=30):
+    """Wait for a background job and return its finished row"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        if job.finished_at:
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(f'Job {job_id} did not finish')
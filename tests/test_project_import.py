@@ -0,0 +1,99 @@
+import csv
+import io
+from urllib.parse import parse_qs, urlparse
+from app.extensions import db
+from app.models.project import Project
+from app.services.project_import import FORM_COLUMNS, MEMBER_COLUMNS, import_project_csv
+from tests.conftest import wait_for_job
+
+
+def responses_csv(*titles):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(dict.fromkeys(list(FORM_COLUMNS) + MEMBER_COLUMNS)))
+    writer.writeheader()
+    for minute, title in enumerate(titles):
+        writer.writerow({
+            'Timestamp': f'03/28/2025 10:{minute:02d}:00',
+            'Project Title': title,
+            'Write about your Idea/project ': f'About {title}',
+            'Demo Model  / Poster ': 'Poster',
+            'Select Branch ': 'Computer',
+            'Select Semester': '4',
+            'First team member name  (for certificate printing)': 'Asha',
+            'Mobile number any one team member': '9876543210',
+            'Faculty Mentor Name': 'Mentor',
+        })
+    return out.getvalue()
+
+
+def import_csv(text, **kwargs):
+    counts = import_project_csv(io.StringIO(text), **kwargs)
+    db.session.commit()
+    return counts
+
+
+def test_reimport_after_admin_deletes_project(app, admin_client):
+    text = responses_csv('Solar Dryer', 'Line Follower', 'Smart Bin')
+    import_csv(text)
+    project = Project.query.filter_by(name='Line Follower').one()
+
+    response = admin_client.post(f'/admin/delete_project/{project.id}')
+    assert response.status_code == 302
+
+    counts = import_csv(text)
+    assert counts == {'inserted': 1, 'updated': 0, 'unchanged': 2}
+    assert sorted(p.name for p in Project.query) == ['Line Follower', 'Smart Bin', 'Solar Dryer']
+
+
+def test_forced_reimport_inserts_projects_deleted_behind_the_ledger(app):
+    text = responses_csv('Solar Dryer', 'Line Follower', 'Smart Bin')
+    import_csv(text)
+    db.session.delete(Project.query.filter_by(name='Smart Bin').one())
+    db.session.commit()
+
+    counts = import_csv(text, skip_unchanged=False)
+    assert counts == {'inserted': 1, 'updated': 2, 'unchanged': 0}
+    assert Project.query.count() == 3
+
+
+def upload_responses(client, text, **fields):
+    response = client.post('/admin/import_projects', data={
+        'csv_file': (io.BytesIO(text.encode()), 'responses.csv'), **fields,
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+    job_id = int(parse_qs(urlparse(response.location).query)['job'][0])
+    job = wait_for_job(job_id)
+    assert job.status == 'succeeded', job.message
+    return job.result
+
+
+def test_reupload_after_admin_deletes_project(app, admin_client):
+    text = responses_csv('Solar Dryer', 'Line Follower', 'Smart Bin')
+    assert upload_responses(admin_client, text)['inserted'] == 3
+    assert upload_responses(admin_client, text)['already_imported']
+
+    project = Project.query.filter_by(name='Line Follower').one()
+    admin_client.post(f'/admin/delete_project/{project.id}')
+
+    result = upload_responses(admin_client, text)
+    assert (result['inserted'], result['unchanged']) == (1, 2)
+    assert Project.query.filter_by(name='Line Follower').count() == 1
+
+
+def test_reupload_of_older_file_restores_its_rows(app, admin_client):
+    original = responses_csv('Solar Dryer', 'Line Follower')
+    corrected = original.replace('About Solar Dryer', 'About the solar dryer')
+    upload_responses(admin_client, original)
+    upload_responses(admin_client, corrected)
+
+    result = upload_responses(admin_client, original)
+    assert (result['updated'], result['unchanged']) == (1, 1)
+    db.session.expire_all()
+    assert Project.query.filter_by(name='Solar Dryer').one().description == 'About Solar Dryer'
+
+
+def test_forced_upload_rewrites_every_row(app, admin_client):
+    text = responses_csv('Solar Dryer', 'Line Follower')
+    upload_responses(admin_client, text)
+    result = upload_responses(admin_client, text, force='y')
+    assert (result['inserted'], result['updated']) == (0, 2)
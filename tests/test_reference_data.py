@@ -0,0 +1,14 @@
+import io
+from app.extensions import db
+from app.services.project_import import import_project_csv
+from app.services.reference_data import reference_data
+from tests.test_project_import import responses_csv
+
+
+def test_departments_created_by_project_import(app):
+    assert reference_data().departments == ()
+
+    import_project_csv(io.StringIO(responses_csv('Solar Dryer')))
+    db.session.commit()
+
+    assert [name for _, name in reference_data().departments] == ['Computer']
@@ -0,0 +1,52 @@
+import importlib.util
+import pathlib
+import uuid
+from sqlalchemy import text
+from app.extensions import db
+from app.models.department import Department
+from app.models.study_material import StudyMaterial
+from app.models.subject import Subject
+from app.models.user import User
+from app.services.search import index_material, search_materials
+
+MIGRATION = pathlib.Path(__file__).parents[1] / 'migrations/versions/5a6c2e8d1f47_add_study_material_search.py'
+
+
+def add_material():
+    department = Department(name='Computer')
+    faculty = User(email='ravi@gppalanpur.in', first_name='Ravi', last_name='Shah',
+                   fs_uniquifier=uuid.uuid4().hex, active=True)
+    db.session.add_all([department, faculty])
+    db.session.flush()
+    subject = Subject(code='4330701', name='Data Structures', semester=3, department_id=department.id)
+    db.session.add(subject)
+    db.session.flush()
+    material = StudyMaterial(title='Linked lists', material_type='lecture_notes', file_path='x.pdf',
+                             subject_id=subject.id, faculty_id=faculty.id)
+    db.session.add(material)
+    db.session.flush()
+    return material
+
+
+def test_search_by_faculty_first_and_last_name(app):
+    material = add_material()
+    index_material(material)
+    db.session.commit()
+
+    assert [m.id for m, _ in search_materials('Ravi')] == [material.id]
+    assert [m.id for m, _ in search_materials('shah linked')] == [material.id]
+
+
+def test_migration_backfill_indexes_faculty_name(app):
+    material = add_material()
+    db.session.commit()
+
+    spec = importlib.util.spec_from_file_location('search_migration', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    db.session.execute(text('DROP TABLE study_materials_fts'))
+    for statement in migration.CREATE['sqlite']:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+    assert [m.id for m, _ in search_materials('Ravi')] == [material.id]
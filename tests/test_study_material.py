@@ -0,0 +1,27 @@
+import io
+from app.extensions import db
+from app.models.blob import Blob
+from app.services.storage import get_storage
+
+
+def stored_blob():
+    sha256, size = get_storage().save(io.BytesIO(b'%PDF- lab manual'))
+    Blob.acquire(sha256, size)
+    db.session.commit()
+    return sha256
+
+
+def test_blob_download_requires_login(app):
+    sha256 = stored_blob()
+    response = app.test_client().get(f'/materials/files/{sha256}/manual.pdf')
+    assert response.status_code == 302
+    assert '/auth/login' in response.location
+
+
+def test_blob_download_is_cached_privately(app, admin_client):
+    sha256 = stored_blob()
+    response = admin_client.get(f'/materials/files/{sha256}/manual.pdf')
+    assert response.status_code == 200
+    assert response.data == b'%PDF- lab manual'
+    assert response.cache_control.private
+    assert not response.cache_control.public
@@ -0,0 +1,66 @@
+import csv
+import io
+import pytest
+from app.extensions import db
+from app.models.job import Job
+from app.models.user import User
+from app.services.reference_data import reference_data
+from app.services import user_import
+from app.services.jobs import pop_artifact
+from app.services.uploads import StagedUpload
+from app.services.user_import import import_users
+
+
+def run_import(text, role_names=()):
+    data = text.encode()
+    job = Job(kind='user_upload', status='running')
+    db.session.add(job)
+    db.session.commit()
+    return import_users(job, StagedUpload('users.csv', len(data), data=data), list(role_names))
+
+
+def test_csv_without_phone_column(app):
+    result = run_import('email,first_name,last_name\n'
+                        'asha@gppalanpur.in,Asha,Patel\n'
+                        'ravi@gppalanpur.in,Ravi,Shah\n')
+    assert result['created'] == 2
+    assert User.query.filter_by(email='asha@gppalanpur.in').one().phone is None
+
+
+def test_bulk_import_refreshes_reference_data(app):
+    before = reference_data()
+    assert 'Aerospace' not in [name for _, name in before.departments]
+
+    run_import('email,first_name,last_name,phone,department,roles\n'
+               'hod@gppalanpur.in,Hina,Desai,9876543210,Aerospace,hod\n', role_names=['faculty'])
+
+    after = reference_data()
+    assert 'Aerospace' in [name for _, name in after.departments]
+    assert {'hod', 'faculty'} <= {name for name, _ in after.roles}
+
+
+def test_failed_import_keeps_passwords_of_committed_users(app, monkeypatch):
+    app.config['IMPORT_CHUNK_SIZE'] = 2
+    insert_users = user_import._insert_users
+    calls = []
+
+    def fail_on_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('database went away')
+        return insert_users(*args)
+
+    monkeypatch.setattr(user_import, '_insert_users', fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        run_import('email,first_name,last_name\n'
+                   'asha@gppalanpur.in,Asha,Patel\n'
+                   'ravi@gppalanpur.in,Ravi,Shah\n'
+                   'mira@gppalanpur.in,Mira,Joshi\n')
+    db.session.rollback()
+
+    job = db.session.scalars(db.select(Job)).one()
+    name, data = pop_artifact(job)
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert [row['email'] for row in rows] == ['asha@gppalanpur.in', 'ravi@gppalanpur.in']
+    assert {user.email for user in User.query} == {'asha@gppalanpur.in', 'ravi@gppalanpur.in'}
+    assert all(row['temporary_password'] for row in rows)